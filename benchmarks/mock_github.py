@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the GitHub REST, search and GraphQL APIs.
+Serves a synthetic PR corpus with configurable latency, rate limits and
+error injection, and counts every call so benchmarks can report them.
+"""
+
+import csv
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# Expected exports are parsed from the bodies by the fetcher's own parser
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'src'))
+from pr_parser import parse_pr
+
+REPO = 'bench/monorepo'
+AUTHOR = 'octocat'
+SEARCH_RESULT_CAP = 1000
+
+PROJECTS = ['Billing', 'Search', 'Roles', 'Onboarding', 'Payments', 'Infra']
+VERBS = ['Add', 'Fix', 'Refactor', 'Remove', 'Speed up', 'Document']
+THINGS = [
+    'invoice export', 'retry handling', 'permission checks', 'signup flow',
+    'webhook parsing', 'deploy scripts', 'cache warming', 'audit logging'
+]
+
+
+def make_corpus(size: int,
+                days: int = 365,
+                author: str = AUTHOR,
+                seed: int = 0) -> List[Dict]:
+    """
+    Build `size` synthetic PRs by `author`, spread evenly over the past
+    `days` days and ordered newest first (highest number first).
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    spacing = timedelta(seconds=days * 86400 * 0.95 / max(size, 1))
+
+    corpus = []
+    for index in range(size):
+        number = size - index
+        created = now - spacing * (index + 1)
+        project = PROJECTS[number % len(PROJECTS)]
+        verb = rng.choice(VERBS)
+        thing = rng.choice(THINGS)
+        merged = rng.random() < 0.8
+        state = 'closed' if merged or rng.random() < 0.5 else 'open'
+        description = (
+            f"{verb} {thing} for {project.lower()}. "
+            f"{'Covers the edge cases reported last sprint. ' * rng.randint(1, 6)}"
+        ).strip()
+        test_plan = 'Unit tests and a manual run in staging.'
+        body = (f"## Description\n{description}\n\n"
+                f"## Test Plan\n{test_plan}\n")
+        attachment = ''
+        if rng.random() < 0.3:
+            attachment = f"https://example.com/shots/{number}.png"
+            body += f"\n![screenshot]({attachment})\n"
+        body += "\n## Checklist\n- [x] Tests\n- [x] Docs\n"
+        corpus.append({
+            'number': number,
+            'title': f"[CS-{number}] {project}: {verb} {thing}",
+            'body': body,
+            'description': f"Description: {description}\n\nTest Plan: {test_plan}",
+            'attachment': attachment,
+            'user': author,
+            'created_at': created,
+            'updated_at': created + timedelta(hours=rng.randint(1, 72)),
+            'state': state,
+            'merged': merged,
+            'additions': rng.randint(1, 800),
+            'deletions': rng.randint(0, 300)
+        })
+    return corpus
+
+
+def detailed_records(corpus: List[Dict]) -> List[Dict]:
+    """The records the fetcher would export for a corpus."""
+    parsed = [parse_pr(pr['title'], pr['body']) for pr in corpus]
+    return [{
+        'pr_url': f"https://github.com/{REPO}/pull/{pr['number']}",
+        'title': pr['title'],
+        'description': pr_parsed.important_description(),
+        'lines_of_code_changes': pr['additions'] + pr['deletions'],
+        'additions': pr['additions'],
+        'deletions': pr['deletions'],
+        'created_at': pr['created_at'].isoformat(),
+        'updated_at': pr['updated_at'].isoformat(),
+        'state': pr['state'],
+        'merged': pr['merged'],
+        'attachments': '; '.join(pr_parsed.attachments)
+    } for pr, pr_parsed in zip(corpus, parsed)]
+
+
+def large_body(pr: Dict, paragraphs: int = 40) -> str:
+    """
+    A long PR body built from a corpus PR: its sections padded with prose,
+    links, images and code, as in big release or migration PRs.
+    """
+    paragraph = (
+        f"{pr['description']} See [the design doc](https://example.com/docs/{pr['number']}) "
+        f"and ![diagram](https://example.com/img/{pr['number']}.png).\n"
+        "```\nmake migrate && make test\n```\n")
+    step = "- [ ] Ran the suite against staging\n"
+    return (f"## Description\n{paragraph * paragraphs}\n"
+            f"## Test Plan\n{step * paragraphs}\n"
+            "## Checklist\n- [x] Tests\n- [x] Docs\n")
+
+
+def write_detailed_csv(corpus: List[Dict], path: str) -> str:
+    """Write the detailed CSV the fetcher would export for a corpus."""
+    records = detailed_records(corpus)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(list(records[0]))
+        writer.writerows(list(record.values()) for record in records)
+    return path
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse_time(value: str) -> datetime:
+    if 'T' not in value:
+        value += 'T00:00:00Z'
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(
+        tzinfo=timezone.utc)
+
+
+class MockGitHub:
+    """
+    Threaded mock GitHub server. `latency` is added to every response;
+    `rate_limits` maps 'core', 'search' and 'graphql' to requests per
+    minute (unlimited if missing); `error_rate` is the fraction of
+    requests answered with a 502.
+    """
+
+    def __init__(self,
+                 corpus: List[Dict],
+                 latency: float = 0.02,
+                 rate_limits: Optional[Dict[str, int]] = None,
+                 error_rate: float = 0.0):
+        self.corpus = corpus
+        self.by_number = {pr['number']: pr for pr in corpus}
+        self.latency = latency
+        self.rate_limits = rate_limits or {}
+        self.error_rate = error_rate
+        self.calls = {}
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(1)
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> 'MockGitHub':
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                          self._handler_class())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _count(self, resource: str):
+        with self._lock:
+            self.calls[resource] = self.calls.get(resource, 0) + 1
+
+    def _rate_limit(self, resource: str):
+        """Return (headers, exceeded) for one request against a resource."""
+        limit = self.rate_limits.get(resource)
+        if not limit:
+            return {}, False
+        now = time.time()
+        with self._lock:
+            start, used = self._windows.get(resource, (now, 0))
+            if now - start >= 60:
+                start, used = now, 0
+            used += 1
+            self._windows[resource] = (start, used)
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(max(0, limit - used)),
+            'X-RateLimit-Reset': str(int(start + 60)),
+            'X-RateLimit-Resource': resource
+        }
+        return headers, used > limit
+
+    def _pr_payload(self, pr: Dict, full: bool = True) -> Dict:
+        payload = {
+            'id': pr['number'],
+            'number': pr['number'],
+            'html_url': f"https://github.com/{REPO}/pull/{pr['number']}",
+            'url': f"{self.url}/repos/{REPO}/pulls/{pr['number']}",
+            'title': pr['title'],
+            'body': pr['body'],
+            'state': pr['state'],
+            'user': {
+                'login': pr['user']
+            },
+            'created_at': _iso(pr['created_at']),
+            'updated_at': _iso(pr['updated_at']),
+            'merged_at': _iso(pr['updated_at']) if pr['merged'] else None
+        }
+        if full:
+            payload.update(merged=pr['merged'],
+                           additions=pr['additions'],
+                           deletions=pr['deletions'])
+        return payload
+
+    def _issue_payload(self, pr: Dict) -> Dict:
+        payload = self._pr_payload(pr, full=False)
+        payload['pull_request'] = {
+            'url': payload.pop('url'),
+            'merged_at': payload.pop('merged_at')
+        }
+        return payload
+
+    def search(self, query: str) -> List[Dict]:
+        """PRs matching a search query, newest first (uncapped)."""
+        terms = dict(
+            term.split(':', 1) for term in query.split() if ':' in term)
+        author = terms.get('author')
+        created_from = created_to = updated_from = None
+        created = terms.get('created', '')
+        if '..' in created:
+            start, end = created.split('..', 1)
+            created_from, created_to = _parse_time(start), _parse_time(end)
+        elif created.startswith('>'):
+            created_from = _parse_time(created.lstrip('>='))
+        if terms.get('updated', '').startswith('>='):
+            updated_from = _parse_time(terms['updated'][2:])
+
+        return [
+            pr for pr in self.corpus
+            if (not author or pr['user'] == author) and (
+                not created_from or pr['created_at'] >= created_from) and (
+                    not created_to or pr['created_at'] <= created_to) and (
+                        not updated_from or pr['updated_at'] >= updated_from)
+        ]
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _guard(self, resource: str):
+                """Count, delay and rate-limit a request; returns headers or None."""
+                mock._count(resource)
+                time.sleep(mock.latency)
+                headers, exceeded = mock._rate_limit(resource)
+                if exceeded:
+                    headers['Retry-After'] = '1'
+                    self._send({'message': 'API rate limit exceeded'}, 403,
+                               headers)
+                    return None
+                if mock.error_rate and mock._random.random() < mock.error_rate:
+                    self._send({'message': 'Server Error'}, 502)
+                    return None
+                return headers
+
+            def _page(self, items, render, params, headers, wrap=None):
+                page = int(params.get('page', ['1'])[0])
+                per_page = int(params.get('per_page', ['30'])[0])
+                chunk = [
+                    render(item)
+                    for item in items[(page - 1) * per_page:page * per_page]
+                ]
+                if page * per_page < len(items):
+                    next_params = {k: v[0] for k, v in params.items()}
+                    next_params['page'] = str(page + 1)
+                    path = urlparse(self.path).path
+                    headers['Link'] = (
+                        f'<{mock.url}{path}?{urlencode(next_params)}>; rel="next"')
+                self._send(wrap(chunk) if wrap else chunk, headers=headers)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                path = url.path
+
+                if path == '/search/issues':
+                    headers = self._guard('search')
+                    if headers is None:
+                        return
+                    matches = mock.search(params.get('q', [''])[0])
+                    return self._page(
+                        matches[:SEARCH_RESULT_CAP], mock._issue_payload,
+                        params, headers, lambda chunk: {
+                            'total_count': len(matches),
+                            'incomplete_results': False,
+                            'items': chunk
+                        })
+
+                headers = self._guard('core')
+                if headers is None:
+                    return
+                if path == '/user':
+                    return self._send({'login': AUTHOR}, headers=headers)
+                if path == f'/repos/{REPO}':
+                    return self._send(
+                        {
+                            'full_name': REPO,
+                            'name': REPO.split('/')[1],
+                            'url': f"{mock.url}/repos/{REPO}"
+                        },
+                        headers=headers)
+                if path == f'/repos/{REPO}/pulls':
+                    return self._page(
+                        mock.corpus,
+                        lambda pr: mock._pr_payload(pr, full=False), params,
+                        headers)
+                match = re.match(rf'/repos/{REPO}/pulls/(\d+)$', path)
+                if match and int(match.group(1)) in mock.by_number:
+                    return self._send(mock._pr_payload(
+                        mock.by_number[int(match.group(1))]),
+                                      headers=headers)
+                self._send({'message': 'Not Found'}, 404, headers)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if urlparse(self.path).path != '/graphql':
+                    mock._count('core')
+                    return self._send({'message': 'Not Found'}, 404)
+
+                headers = self._guard('graphql')
+                if headers is None:
+                    return
+                variables = request.get('variables') or {}
+                matches = mock.search(variables.get('searchQuery', ''))
+                visible = matches[:SEARCH_RESULT_CAP]
+                offset = int(variables.get('cursor') or 0)
+                chunk = visible[offset:offset + 100]
+                nodes = [{
+                    'number': pr['number'],
+                    'url': f"https://github.com/{REPO}/pull/{pr['number']}",
+                    'title': pr['title'],
+                    'body': pr['body'],
+                    'additions': pr['additions'],
+                    'deletions': pr['deletions'],
+                    'state': 'MERGED' if pr['merged'] else pr['state'].upper(),
+                    'merged': pr['merged'],
+                    'createdAt': _iso(pr['created_at']),
+                    'updatedAt': _iso(pr['updated_at'])
+                } for pr in chunk]
+                self._send(
+                    {
+                        'data': {
+                            'search': {
+                                'issueCount': len(matches),
+                                'nodes': nodes,
+                                'pageInfo': {
+                                    'hasNextPage':
+                                    offset + 100 < len(visible),
+                                    'endCursor': str(offset + 100)
+                                }
+                            }
+                        }
+                    },
+                    headers=headers)
+
+        return Handler
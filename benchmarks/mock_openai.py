@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API and the Files and
+Batches endpoints behind batch jobs.
+Answers summary prompts with short canned text and batched JSON prompts
+with one summary per PR URL, with configurable latency, rate limits and
+error injection. Batch jobs run in the background after batch_latency
+seconds, failing each request with the same error_rate. Request and
+token counts are kept for reporting.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+CHARS_PER_TOKEN = 4
+
+
+class MockOpenAI:
+    """
+    Threaded mock OpenAI server. Each completion takes `latency` seconds
+    plus `token_latency` per generated token. `rate_limit` is requests
+    per minute (unlimited if None); `error_rate` is the fraction of
+    requests answered with a 500. Batch jobs complete `batch_latency`
+    seconds after they are created.
+    """
+
+    def __init__(self,
+                 latency: float = 0.1,
+                 token_latency: float = 0.0,
+                 rate_limit: Optional[int] = None,
+                 error_rate: float = 0.0,
+                 batch_latency: float = 0.5):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.batch_latency = batch_latency
+        self.requests = 0
+        self.batch_requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+        self._window = (time.time(), 0)
+        self._lock = threading.Lock()
+        self._random = random.Random(2)
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def start(self) -> 'MockOpenAI':
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                          self._handler_class())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @staticmethod
+    def reply(prompt: str) -> str:
+        """Canned completion for a prompt from the summarizer."""
+        if prompt.rstrip().endswith('JSON:'):
+            urls = re.findall(r'"url": "([^"]+)"', prompt)
+            return json.dumps({
+                url: f"Summary of PR {url.rsplit('/', 1)[-1]}: tightened the change and added tests."
+                for url in urls
+            })
+        title = re.search(r'^Title: (.*)$', prompt, re.MULTILINE)
+        if title:
+            return f"{title.group(1)} - updated the implementation and its tests."
+        return ("## Key Projects\n- Billing, Search and Roles work.\n"
+                "## Themes\n- Reliability and cleanup.\n")
+
+    def complete(self, request: Dict) -> Dict:
+        """Chat completion payload for a request, counting its tokens."""
+        messages = request.get('messages', [])
+        prompt = messages[-1]['content'] if messages else ''
+        content = self.reply(prompt)
+        prompt_tokens = sum(len(message['content'])
+                            for message in messages) // CHARS_PER_TOKEN + 1
+        completion_tokens = len(content) // CHARS_PER_TOKEN + 1
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return {
+            'id': f"chatcmpl-{self.requests + self.batch_requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {
+                    'role': 'assistant',
+                    'content': content
+                }
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+    def _failed(self) -> bool:
+        """Whether to inject an error into this request."""
+        with self._lock:
+            return bool(self.error_rate
+                        and self._random.random() < self.error_rate)
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> Dict:
+        """Store an uploaded (or generated) file and return its object."""
+        with self._lock:
+            file_id = f"file-{len(self.files) + 1}"
+            self.files[file_id] = {
+                'id': file_id,
+                'object': 'file',
+                'bytes': len(content),
+                'created_at': int(time.time()),
+                'filename': filename,
+                'purpose': purpose,
+                'status': 'processed',
+                'content': content
+            }
+        return self.files[file_id]
+
+    def create_batch(self, request: Dict) -> Dict:
+        """Create a batch job over an uploaded file and start running it."""
+        with self._lock:
+            batch_id = f"batch_{len(self.batches) + 1}"
+            batch = self.batches[batch_id] = {
+                'id': batch_id,
+                'object': 'batch',
+                'endpoint': request['endpoint'],
+                'errors': None,
+                'input_file_id': request['input_file_id'],
+                'completion_window': request['completion_window'],
+                'status': 'validating',
+                'output_file_id': None,
+                'error_file_id': None,
+                'created_at': int(time.time()),
+                'completed_at': None,
+                'request_counts': {
+                    'total': 0,
+                    'completed': 0,
+                    'failed': 0
+                },
+                'metadata': request.get('metadata')
+            }
+        threading.Thread(target=self._run_batch, args=(batch, ),
+                         daemon=True).start()
+        return batch
+
+    def _run_batch(self, batch: Dict):
+        """Answer every request of a batch, then publish its result files."""
+        lines = self.files[batch['input_file_id']]['content'].splitlines()
+        batch['status'] = 'in_progress'
+        batch['request_counts']['total'] = len(lines)
+        time.sleep(self.batch_latency)
+
+        outputs, errors = [], []
+        for number, line in enumerate(lines, start=1):
+            item = json.loads(line)
+            with self._lock:
+                self.batch_requests += 1
+            result = {
+                'id': f"batch_req_{batch['id']}_{number}",
+                'custom_id': item['custom_id'],
+                'error': None
+            }
+            if self._failed():
+                result['response'] = {
+                    'status_code': 500,
+                    'body': {
+                        'error': {
+                            'message': 'Internal error'
+                        }
+                    }
+                }
+                errors.append(result)
+            else:
+                result['response'] = {
+                    'status_code': 200,
+                    'body': self.complete(item['body'])
+                }
+                outputs.append(result)
+
+        for key, results in (('output_file_id', outputs), ('error_file_id',
+                                                            errors)):
+            if results:
+                content = ''.join(json.dumps(result) + '\n'
+                                  for result in results).encode()
+                batch[key] = self.add_file(content, f"{batch['id']}.jsonl",
+                                           'batch_output')['id']
+        batch['request_counts'].update(completed=len(outputs),
+                                       failed=len(errors))
+        batch['completed_at'] = int(time.time())
+        batch['status'] = 'completed'
+
+    def _rate_limit(self):
+        """Return (headers, exceeded) for one request."""
+        if not self.rate_limit:
+            return {}, False
+        now = time.time()
+        with self._lock:
+            start, used = self._window
+            if now - start >= 60:
+                start, used = now, 0
+            used += 1
+            self._window = (start, used)
+        headers = {
+            'x-ratelimit-limit-requests': str(self.rate_limit),
+            'x-ratelimit-remaining-requests':
+            str(max(0, self.rate_limit - used)),
+            'x-ratelimit-reset-requests': f"{max(0.0, start + 60 - now):.3f}s"
+        }
+        return headers, used > self.rate_limit
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                match = re.search(r'/batches/([^/]+)$', self.path)
+                if match and match.group(1) in mock.batches:
+                    return self._send(mock.batches[match.group(1)])
+                match = re.search(r'/files/([^/]+)/content$', self.path)
+                if match and match.group(1) in mock.files:
+                    body = mock.files[match.group(1)]['content']
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/jsonl')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    return self.wfile.write(body)
+                self._send({'error': {'message': 'Not Found'}}, 404)
+
+            def _upload(self, body: bytes):
+                """Store a multipart/form-data file upload."""
+                message = BytesParser(policy=HTTP).parsebytes(
+                    b'Content-Type: ' +
+                    self.headers['Content-Type'].encode() + b'\r\n\r\n' +
+                    body)
+                fields = {
+                    part.get_param('name', header='content-disposition'):
+                    part
+                    for part in message.iter_parts()
+                }
+                upload = fields['file']
+                stored = mock.add_file(
+                    upload.get_payload(decode=True), upload.get_filename(),
+                    fields['purpose'].get_payload(decode=True).decode())
+                self._send({
+                    key: value
+                    for key, value in stored.items() if key != 'content'
+                })
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if self.path.endswith('/files'):
+                    return self._upload(body)
+                request = json.loads(body or b'{}')
+                if self.path.endswith('/batches'):
+                    return self._send(mock.create_batch(request))
+                if not self.path.endswith('/chat/completions'):
+                    return self._send({'error': {'message': 'Not Found'}},
+                                      404)
+
+                with mock._lock:
+                    mock.requests += 1
+                headers, exceeded = mock._rate_limit()
+                if exceeded:
+                    headers['retry-after'] = '1'
+                    return self._send(
+                        {
+                            'error': {
+                                'message': 'Rate limit reached',
+                                'type': 'requests'
+                            }
+                        }, 429, headers)
+                if mock._failed():
+                    return self._send(
+                        {'error': {
+                            'message': 'Internal error'
+                        }}, 500, headers)
+
+                payload = mock.complete(request)
+                time.sleep(mock.latency + mock.token_latency *
+                           payload['usage']['completion_tokens'])
+                self._send(payload, 200, headers)
+
+        return Handler
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the fetcher, the summarizer and the full workflow.
+Runs each scenario in a fresh subprocess against local mock GitHub and
+OpenAI servers, reports wall time, API calls, tokens, peak memory and
+throughput, and compares the results with a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10,1000
+    python benchmarks/run_benchmarks.py --scenarios fetch --sizes 50000
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+sys.path.insert(0, BENCH_DIR)
+
+from mock_github import (AUTHOR, REPO, MockGitHub, detailed_records,
+                         large_body, make_corpus, write_detailed_csv)
+from mock_openai import MockOpenAI
+
+DAYS = 365
+DETAILED_CSV = 'output/pr_bench_detailed.csv'
+RESULT_PREFIX = 'BENCH_RESULT '
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+SCENARIOS = {
+    'fetch': 'fetch_user_prs with the REST engine',
+    'fetch-graphql': 'fetch_user_prs with the GraphQL engine',
+    'summarize': 'process_pr_csv on a detailed CSV',
+    'summarize-batch': 'process_pr_csv through an offline batch job',
+    'records': 'read a detailed CSV into PR records and write it back',
+    'parse': 'parse descriptions, attachments and projects of large bodies',
+    'pipeline': 'main.py, fetching then summarizing',
+    'pipeline-stream': 'main.py with STREAM=1'
+}
+
+# Metrics compared against the baseline; higher is worse for all of them
+BASELINE_METRICS = [
+    'wall_s', 'peak_mb', 'github_calls', 'openai_requests', 'tokens'
+]
+
+
+def run_worker(scenario: str, size: int):
+    """Run one scenario in this process and print its measurements."""
+    sys.path.insert(0, SRC_DIR)
+    records = size
+    detailed_sha256 = None
+
+    if scenario.startswith('fetch'):
+        from github_pr_fetcher import PRAnalyzer
+        analyzer = PRAnalyzer(os.environ['GITHUB_TOKEN'],
+                              int(os.getenv('FETCH_WORKERS', '8')),
+                              os.environ['FETCH_ENGINE'],
+                              os.environ['GITHUB_GRAPHQL_URL'],
+                              api_url=os.environ['GITHUB_API_URL'])
+        started = time.perf_counter()
+        records = len(analyzer.fetch_user_prs(REPO, AUTHOR, DAYS))
+    elif scenario in ('summarize', 'summarize-batch'):
+        from pr_summarizer import process_pr_csv
+        started = time.perf_counter()
+        if not process_pr_csv(DETAILED_CSV):
+            records = 0
+    elif scenario == 'parse':
+        from pr_parser import parse_bodies
+        corpus = make_corpus(size, DAYS)
+        titles = [pr['title'] for pr in corpus]
+        bodies = [large_body(pr) for pr in corpus]
+        started = time.perf_counter()
+        records = len(parse_bodies(titles, bodies))
+    elif scenario == 'records':
+        from pr_records import read_pr_csv, write_pr_csv
+        started = time.perf_counter()
+        prs = list(read_pr_csv(DETAILED_CSV))
+        records = write_pr_csv('output/pr_bench_roundtrip.csv', prs)
+    else:
+        import glob
+        import runpy
+        sys.argv = [os.path.join(ROOT_DIR, 'main.py')]
+        started = time.perf_counter()
+        try:
+            runpy.run_path(sys.argv[0], run_name='__main__')
+        except SystemExit:
+            pass
+        if not glob.glob('output/*_summarized.csv'):
+            records = 0
+        detailed = glob.glob('output/*_detailed.csv')
+        if detailed:
+            with open(detailed[0], 'rb') as f:
+                detailed_sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    wall = time.perf_counter() - started
+    print(RESULT_PREFIX + json.dumps({
+        'records': records,
+        'wall_s': round(wall, 3),
+        'peak_mb': round(peak_rss_kb() / 1024, 1),
+        'detailed_sha256': detailed_sha256
+    }))
+
+
+def peak_rss_kb() -> int:
+    """
+    Peak resident memory of this process. On Linux ru_maxrss carries over
+    from the parent across exec, which would charge the corpus held by the
+    benchmark runner to every worker, so VmHWM is preferred.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """Parse 'core=900,search=30' into a dict."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, value = item.split('=', 1)
+        limits[name.strip()] = int(value)
+    return limits
+
+
+def run_scenario(scenario: str, size: int, corpus: List[Dict],
+                 args) -> Dict:
+    """Run one scenario in a subprocess against fresh mock servers."""
+    github = MockGitHub(corpus, args.github_latency,
+                        parse_limits(args.github_rpm), args.error_rate).start()
+    openai = MockOpenAI(args.openai_latency, args.token_latency,
+                        args.openai_rpm, args.error_rate).start()
+    workdir = tempfile.mkdtemp(prefix='pr-bench-')
+    if scenario in ('summarize', 'summarize-batch', 'records'):
+        # Written here so the worker's memory and time cover only the
+        # code under test
+        write_detailed_csv(corpus, os.path.join(workdir, DETAILED_CSV))
+
+    env = dict(os.environ,
+               GITHUB_TOKEN='bench-token',
+               OPENAI_API_KEY='bench-key',
+               OPENAI_BASE_URL=openai.url,
+               GITHUB_API_URL=github.url,
+               GITHUB_GRAPHQL_URL=f"{github.url}/graphql",
+               GITHUB_REPO=REPO,
+               GITHUB_USERNAME=AUTHOR,
+               DAYS=str(DAYS),
+               FETCH_ENGINE='graphql' if scenario == 'fetch-graphql' else 'rest',
+               STREAM='1' if scenario == 'pipeline-stream' else '',
+               SUMMARY_BATCH_JOB='1' if scenario == 'summarize-batch' else '',
+               BATCH_POLL_SECONDS='0.1',
+               PR_STORE='',
+               GITHUB_CACHE_MAX_MB='0',
+               LLM_CACHE_MAX_ENTRIES='0')
+    if not args.github_rpm:
+        # Unlimited mock: don't let client-side pacing dominate the timings
+        env.update(GITHUB_SEARCH_RPM='1000000',
+                   GITHUB_CORE_RPM='1000000',
+                   GITHUB_GRAPHQL_RPM='1000000')
+    if not args.openai_rpm:
+        env['OPENAI_RPM'] = '1000000'
+
+    try:
+        completed = subprocess.run([
+            sys.executable,
+            os.path.abspath(__file__), '--worker', scenario, '--size',
+            str(size)
+        ],
+                                   cwd=workdir,
+                                   env=env,
+                                   capture_output=True,
+                                   text=True,
+                                   timeout=args.timeout)
+        output = completed.stdout.splitlines()
+        if args.verbose:
+            print(completed.stdout)
+        results = [
+            line[len(RESULT_PREFIX):] for line in output
+            if line.startswith(RESULT_PREFIX)
+        ]
+        if not results:
+            print(completed.stdout[-2000:])
+            print(completed.stderr[-2000:])
+            raise RuntimeError(f"{scenario} worker produced no result")
+        measured = json.loads(results[-1])
+    finally:
+        github.stop()
+        openai.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'scenario': scenario,
+        'size': size,
+        'records': measured['records'],
+        'wall_s': measured['wall_s'],
+        'peak_mb': measured['peak_mb'],
+        'github_calls': github.total_calls(),
+        'github_calls_by_resource': dict(github.calls),
+        # Synchronous and batch requests; both are billed per request
+        'openai_requests': openai.requests + openai.batch_requests,
+        'openai_batch_requests': openai.batch_requests,
+        'tokens': openai.total_tokens,
+        'prs_per_s': round(size / measured['wall_s'], 1)
+        if measured['wall_s'] else None,
+        'detailed_sha256': measured.get('detailed_sha256')
+    }
+
+
+def check_clusters(corpus: List[Dict]) -> List[str]:
+    """
+    Return one message per near-duplicate cluster that mixes different
+    changes. Corpus PRs only differ from their true duplicates in the
+    ticket prefix of the title and the length of the description, so
+    e.g. 'Roles: Fix cache warming' must never share a summary with
+    'Roles: Remove cache warming'.
+    """
+    from pr_dedup import cluster_prs
+    records = detailed_records(corpus)
+    changes = {}
+    for record, cluster_id in zip(records, cluster_prs(records)):
+        changes.setdefault(cluster_id, set()).add(
+            re.sub(r'^\[[^\]]*\]\s*', '', record['title']))
+    return [
+        f"dedup@{len(corpus)}: cluster {cluster_id} merges {sorted(titles)}"
+        for cluster_id, titles in changes.items() if len(titles) > 1
+    ]
+
+
+def check_outputs(results: List[Dict]) -> List[str]:
+    """
+    Return one message per size at which streaming and non-streaming runs
+    wrote different detailed CSVs; streaming must not change the export.
+    """
+    mismatches = []
+    digests = {(result['scenario'], result['size']): result['detailed_sha256']
+               for result in results if result.get('detailed_sha256')}
+    for (scenario, size), digest in digests.items():
+        streamed = digests.get(('pipeline-stream', size))
+        if scenario == 'pipeline' and streamed and streamed != digest:
+            mismatches.append(
+                f"pipeline@{size}: detailed CSV differs with STREAM=1")
+    return mismatches
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Return one message per metric that regressed beyond the tolerance."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(f"{result['scenario']}@{result['size']}")
+        if not reference:
+            continue
+        for metric in BASELINE_METRICS:
+            before, after = reference.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            # Small absolute slack keeps near-zero metrics from flapping
+            if after > before * (1 + tolerance) + 0.05:
+                regressions.append(
+                    f"{result['scenario']}@{result['size']} {metric}: {before} -> {after}"
+                )
+    return regressions
+
+
+def print_table(results: List[Dict]):
+    header = f"{'scenario':<16}{'size':>7}{'records':>9}{'wall s':>9}{'PRs/s':>9}{'GitHub':>8}{'OpenAI':>8}{'tokens':>10}{'peak MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['scenario']:<16}{result['size']:>7}{result['records']:>9}{result['wall_s']:>9.2f}{result['prs_per_s'] or 0:>9.1f}{result['github_calls']:>8}{result['openai_requests']:>8}{result['tokens']:>10}{result['peak_mb']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Offline benchmarks against mock GitHub and OpenAI servers')
+    parser.add_argument('--scenarios',
+                        default='fetch,summarize,pipeline',
+                        help=f"Comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument('--sizes',
+                        default='10,1000',
+                        help='Comma-separated corpus sizes (10 to 100000 PRs)')
+    parser.add_argument('--github-latency', type=float, default=0.02)
+    parser.add_argument('--openai-latency', type=float, default=0.1)
+    parser.add_argument('--token-latency',
+                        type=float,
+                        default=0.0,
+                        help='Extra OpenAI seconds per completion token')
+    parser.add_argument(
+        '--github-rpm',
+        default='',
+        help="Mock GitHub limits per minute, e.g. 'core=900,search=30'; "
+        "client pacing then uses its defaults")
+    parser.add_argument('--openai-rpm',
+                        type=int,
+                        default=None,
+                        help='Mock OpenAI requests per minute')
+    parser.add_argument('--error-rate',
+                        type=float,
+                        default=0.0,
+                        help='Fraction of mock responses that are 5xx')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=0.25,
+                        help='Allowed relative regression before failing')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--timeout', type=float, default=3600)
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.size)
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(',')]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    results = []
+    mismatches = []
+    for size in sizes:
+        corpus = make_corpus(size, DAYS)
+        for scenario in scenarios:
+            print(f"⏱️  {scenario} ({SCENARIOS[scenario]}), {size} PRs...")
+            results.append(run_scenario(scenario, size, corpus, args))
+        mismatches += check_clusters(corpus)
+
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    mismatches += check_outputs(results)
+    if mismatches:
+        print(f"\n❌ {len(mismatches)} output mismatch(es):")
+        for message in mismatches:
+            print(f"  {message}")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        for result in results:
+            baseline[f"{result['scenario']}@{result['size']}"] = {
+                metric: result[metric]
+                for metric in BASELINE_METRICS
+            }
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n📌 Baseline updated: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    if baseline:
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == '__main__':
+    main()
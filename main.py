@@ -1,26 +1,255 @@
 #!/usr/bin/env python3
 """
 Main entry point for GitHub PR Analytics Suite
-Complete workflow: fetches PRs from GitHub and then generates AI summaries.
+Subcommands: fetch (PRs to CSV), summarize (AI summaries of a CSV), report
+(re-analyze a summarized CSV), run (the complete workflow, the default)
+and rollups (aggregates from the rollup index).
+Set STREAM=1 to summarize PRs while later ones are still being fetched.
+
+Heavy libraries (PyGithub, OpenAI) are imported only by the
+subcommands that need them, so --help and short jobs start quickly.
 """
 
-if __name__ == "__main__":
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'src'))
+
+# Modules each subcommand needs, imported up front so start-up time is
+# measured in one place; nothing else heavy is loaded
+COMMAND_MODULES = {
+    'fetch': ['github', 'github_pr_fetcher'],
+    'summarize': ['openai', 'pr_summarizer'],
+    'report': ['openai', 'pr_summarizer'],
+    'run': ['github', 'openai', 'github_pr_fetcher', 'pr_summarizer'],
+    'rollups': ['pr_rollups']
+}
+
+# Imports faster than this are left out of the start-up line
+REPORTED_IMPORT_SECONDS = 0.01
+
+
+def load_modules(command: str):
+    """
+    Import the modules a subcommand needs, then print and record the cold
+    start: time from launch until the command is ready to do work.
+    """
+    timings = []
+    for name in COMMAND_MODULES[command]:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # Missing optional libraries are reported by the code that uses
+            # them
+            continue
+        timings.append((name, time.perf_counter() - started))
+
+    from metrics import get_metrics
+    ready = time.perf_counter() - STARTED
+    get_metrics().record_stage('startup', ready)
+    slow = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in timings
+                     if seconds >= REPORTED_IMPORT_SECONDS)
+    print(f"⚡ Ready in {ready:.2f}s" + (f" (imports: {slow})" if slow else ''))
+
+
+def run_streaming(resume: bool = False):
+    """
+    Fetch and summarize concurrently: fetched PRs flow through a bounded
+    queue to the summarizer, so network-bound fetching and LLM-bound
+    summarizing overlap. Returns (detailed CSV, summarized CSV).
+    """
+    import queue
+    import threading
+    from github_pr_fetcher import main as fetch_prs
+    from checkpoint import Checkpoint
+    from pr_summarizer import PRSummarizer, save_summarized_results
+
+    concurrency = int(os.getenv('SUMMARY_CONCURRENCY', '8'))
+    summarizer = PRSummarizer()
+
+    # The queue bound applies backpressure to the fetcher if summarizing
+    # falls behind
+    pr_queue = queue.Queue(maxsize=concurrency * 4)
+    result = {}
+    checkpoint = Checkpoint('output/checkpoints/summaries_stream.jsonl',
+                            resume)
+
+    def produce():
+        try:
+            result['csv_file'] = fetch_prs(on_pr=pr_queue.put, resume=resume)
+        finally:
+            pr_queue.put(None)  # Tell the summarizer no more PRs are coming
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    with summarizer.metrics.stage('summarize'):
+        summarized = summarizer.summarize_stream(pr_queue, concurrency,
+                                                 checkpoint)
+    producer.join()
+
+    csv_file = result.get('csv_file')
+    if not csv_file or not summarized:
+        checkpoint.close()
+        return csv_file, None
+
+    print(f"✅ PR data saved to: {csv_file}")
+    print()
+    summary_file = save_summarized_results(summarized, summarizer, csv_file,
+                                           None, concurrency)
+    checkpoint.close(remove=True)
+    return csv_file, summary_file
+
+
+def command_fetch(args) -> bool:
+    """Fetch PRs from GitHub into a detailed CSV."""
+    from github_pr_fetcher import main as fetch_prs, parse_field_list
+    return bool(
+        fetch_prs(resume=args.resume, fields=parse_field_list(args.fields)))
+
+
+def command_summarize(args) -> bool:
+    """Generate AI summaries for a detailed CSV."""
+    from pr_summarizer import main as summarize
+    return bool(summarize(args))
+
+
+def command_report(args) -> bool:
+    """
+    Re-run the pattern analysis and rewrite the markdown report for an
+    already summarized CSV or columnar dataset, without summarizing PRs
+    again. A dataset is read for the report's columns only.
+    """
+    from pr_columnar import REPORT_COLUMNS, is_dataset, read_dataset
+    from pr_records import read_pr_csv
+    from pr_summarizer import (REQUIRED_FIELDS, PRSummarizer,
+                               find_latest_csv, missing_fields,
+                               save_summarized_results)
+
+    csv_file = args.csv_file or find_latest_csv(summarized=True)
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+        if is_dataset(csv_file):
+            prs = read_dataset(csv_file, REPORT_COLUMNS)
+        else:
+            prs = list(read_pr_csv(csv_file))
+        print(f"📊 Loaded {len(prs)} summarized PRs from {csv_file}")
+    except Exception as e:
+        print(f"❌ Error loading CSV: {e}")
+        return False
+    missing = missing_fields(prs, REQUIRED_FIELDS)
+    if missing:
+        print(f"❌ {csv_file} has no {', '.join(missing)} column(s)")
+        return False
+    if not prs or 'ai_summary' not in prs[0]:
+        print(f"❌ {csv_file} has no ai_summary column; run summarize first.")
+        return False
 
-        print("🚀 Starting GitHub PR Analytics Suite")
-        print("=" * 50)
+    concurrency = args.concurrency or int(
+        os.getenv('SUMMARY_CONCURRENCY', '8'))
+    # The data is unchanged; only the report next to it is rewritten
+    output_file = os.path.splitext(csv_file)[0] + '.csv'
+    return bool(
+        save_summarized_results(prs,
+                                PRSummarizer(),
+                                csv_file,
+                                output_file,
+                                concurrency,
+                                write_data=False))
+
+
+def command_rollups(args) -> bool:
+    """
+    Print (or write as markdown) PR aggregates for a date range from the
+    rollup index, optionally indexing exported CSVs or datasets first.
+    """
+    from pr_columnar import is_dataset, read_dataset
+    from pr_records import read_pr_csv
+    from pr_rollups import (ROLLUP_FIELDS, RollupIndex, format_rollups,
+                            quarter_range)
+
+    path = os.getenv('ROLLUP_INDEX') or 'output/pr_rollups.sqlite'
+    group_by = [name.strip() for name in args.by.split(',') if name.strip()]
+    since, until = args.since, args.until
+    try:
+        if args.quarter:
+            since, until = quarter_range(args.quarter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
 
+    index = RollupIndex(path)
+    try:
+        for export in args.add or []:
+            prs = (read_dataset(export,
+                                list(ROLLUP_FIELDS) + ['repo', 'author'],
+                                derived=True)
+                   if is_dataset(export) else read_pr_csv(export))
+            print(f"🗂️  Indexed {index.add_prs(prs)} new or changed PRs from {export}")
+
+        try:
+            rows = index.query(since, until, group_by, repo=args.repo,
+                               author=args.author, project=args.project)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        totals = index.totals(since, until, repo=args.repo,
+                              author=args.author, project=args.project)
+    finally:
+        index.close()
+
+    period = f"{since or 'start'} to {until or 'now'}"
+    report = (f"# PR Rollups\n\n"
+              f"**Period:** {period}  \n"
+              f"**Total PRs:** {totals['prs']:,} ({totals['merged']:,} merged, "
+              f"{totals['closed']:,} closed, {totals['open']:,} open)  \n"
+              f"**Total Lines Changed:** {totals['lines']:,}  \n\n"
+              f"{format_rollups(rows, group_by)}\n")
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+        print(f"📝 Saved rollup report to {args.output}")
+    else:
+        print(report)
+    return True
+
+
+def command_run(args) -> bool:
+    """Fetch PRs, then summarize them (concurrently with STREAM=1)."""
+    print("🚀 Starting GitHub PR Analytics Suite")
+    print("=" * 50)
+
+    stream = args.stream or os.getenv('STREAM', '').lower() in ('1', 'true',
+                                                              'yes')
+    batch_job = args.batch_job or os.getenv(
+        'SUMMARY_BATCH_JOB', '').lower() in ('1', 'true', 'yes')
+    if stream and batch_job:
+        # A batch job needs every PR up front
+        print("ℹ️  Batch jobs summarize after fetching; streaming is off")
+        stream = False
+
+    if stream:
+        print("📊🤖 Fetching PRs and generating AI summaries (streaming)...")
+        csv_file, summary_file = run_streaming(args.resume)
+
+        if not csv_file:
+            print("❌ PR fetching failed. Stopping workflow.")
+            return False
+    else:
         # Step 1: Fetch PRs from GitHub
         print("📊 Step 1: Fetching PRs from GitHub...")
         from github_pr_fetcher import main as fetch_prs
-        csv_file = fetch_prs()
+        csv_file = fetch_prs(resume=args.resume)
 
         if not csv_file:
             print("❌ PR fetching failed. Stopping workflow.")
-            sys.exit(1)
+            return False
 
         print(f"✅ PR data saved to: {csv_file}")
         print()
@@ -28,21 +257,116 @@ if __name__ == "__main__":
         # Step 2: Generate AI summaries
         print("🤖 Step 2: Generating AI summaries...")
         from pr_summarizer import process_pr_csv
-        summary_file = process_pr_csv(csv_file)
-
-        if summary_file:
-            print()
-            print("🎉 WORKFLOW COMPLETE!")
-            print("=" * 50)
-            print(f"📁 Detailed PR data: {csv_file}")
-            print(f"🤖 AI summarized data: {summary_file}")
-            print(
-                f"📝 Pattern analysis: {summary_file.replace('_summarized.csv', '_summary.md')}"
-            )
-        else:
-            print("⚠️  PR fetching completed, but AI summarization failed.")
-            print(f"📁 You can still use the detailed PR data: {csv_file}")
+        summary_file = process_pr_csv(csv_file,
+                                      resume=args.resume,
+                                      batch_job=batch_job)
+
+    if summary_file:
+        print()
+        print("🎉 WORKFLOW COMPLETE!")
+        print("=" * 50)
+        print(f"📁 Detailed PR data: {csv_file}")
+        print(f"🤖 AI summarized data: {summary_file}")
+        print(
+            f"📝 Pattern analysis: {summary_file.replace('_summarized.csv', '_summary.md')}"
+        )
+        return True
 
+    print("⚠️  PR fetching completed, but AI summarization failed.")
+    print(f"📁 You can still use the detailed PR data: {csv_file}")
+    return False
+
+
+COMMANDS = {
+    'fetch': command_fetch,
+    'summarize': command_summarize,
+    'report': command_report,
+    'run': command_run,
+    'rollups': command_rollups
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser with one subparser per command."""
+    parser = argparse.ArgumentParser(
+        description='Fetch GitHub PRs and generate AI summaries')
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    # Both modules import their heavy dependencies lazily, so borrowing
+    # their option definitions keeps --help fast
+    import github_pr_fetcher
+    import pr_summarizer
+    github_pr_fetcher.add_arguments(
+        subparsers.add_parser('fetch', help='Fetch PRs to a detailed CSV'))
+    pr_summarizer.add_arguments(
+        subparsers.add_parser(
+            'summarize',
+            help='Summarize a detailed CSV (default: the latest)'))
+
+    report = subparsers.add_parser(
+        'report',
+        help='Rebuild the analysis report from a summarized CSV '
+        '(default: the latest)')
+    report.add_argument('csv_file',
+                        nargs='?',
+                        help='Summarized CSV file or columnar dataset')
+    report.add_argument(
+        '--concurrency',
+        type=int,
+        help='Maximum simultaneous analysis requests (default: 8)')
+
+    run = subparsers.add_parser(
+        'run', help='Fetch, then summarize (default command)')
+    run.add_argument('--resume',
+                     action='store_true',
+                     help='Resume an interrupted run from its checkpoints')
+    run.add_argument('--stream',
+                     action='store_true',
+                     help='Summarize while fetching (same as STREAM=1)')
+    run.add_argument(
+        '--batch-job',
+        action='store_true',
+        help='Summarize through an offline Batch API job (same as '
+        'SUMMARY_BATCH_JOB=1)')
+
+    rollups = subparsers.add_parser(
+        'rollups',
+        help='Aggregate PRs by project, author, repo or week from the '
+        'rollup index (ROLLUP_INDEX)')
+    rollups.add_argument('--since', help='First day, YYYY-MM-DD')
+    rollups.add_argument('--until', help='Last day, YYYY-MM-DD')
+    rollups.add_argument('--quarter',
+                         help='Calendar quarter such as 2024Q2 '
+                         '(overrides --since/--until)')
+    rollups.add_argument(
+        '--by',
+        default='project',
+        help='Comma-separated grouping: week, repo, author, project '
+        '(default: project)')
+    rollups.add_argument('--repo', help='Only this repository')
+    rollups.add_argument('--author', help='Only this author')
+    rollups.add_argument('--project', help='Only this project')
+    rollups.add_argument('--add',
+                         action='append',
+                         metavar='FILE',
+                         help='Index an exported CSV or dataset first '
+                         '(repeatable)')
+    rollups.add_argument('--output', help='Write the report to this file')
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    # Without a subcommand, behave like the original single-command entry
+    # point: `python main.py --resume` is `python main.py run --resume`
+    if not argv or (argv[0].startswith('-') and
+                    argv[0] not in ('-h', '--help')):
+        argv = ['run'] + argv
+    args = build_parser().parse_args(argv)
+
+    try:
+        load_modules(args.command)
+        return 0 if COMMANDS[args.command](args) else 1
     except ImportError as e:
         print(f"❌ Error: Could not import required modules: {e}")
         print(
@@ -50,6 +374,11 @@ if __name__ == "__main__":
         )
         print("Also ensure you have all required dependencies installed:")
         print("  pip install -r requirements.txt")
+        return 1
     except Exception as e:
         print(f"❌ Error running PR Analytics Suite: {e}")
-        sys.exit(1)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Batch Jobs
+Offline chat completions through the OpenAI Batch API: requests are
+written to a JSONL job file, uploaded and run as a batch job, and results
+are read back keyed by each request's custom_id. Batches are billed at
+about half the synchronous price and don't draw on the per-minute request
+limits, at the cost of finishing within the completion window instead of
+seconds.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Tuple
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+COMPLETION_WINDOW = '24h'
+
+# The Batch API accepts at most 50,000 requests per job file
+MAX_REQUESTS_PER_BATCH = 50000
+
+FINISHED_STATUSES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+
+def write_job_file(path: str, requests: Iterable[Tuple[str, Dict]]) -> int:
+    """
+    Write (custom_id, request body) pairs as a batch job file and return
+    the number of requests written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for custom_id, body in requests:
+            f.write(
+                json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': BATCH_ENDPOINT,
+                    'body': body
+                }) + '\n')
+            count += 1
+    return count
+
+
+class BatchRunner:
+
+    def __init__(self, client, scheduler, poll_seconds: float = 30):
+        """
+        Run batch jobs with an OpenAI client. Job management calls are
+        retried through the scheduler on rate-limit and server errors.
+        """
+        self.client = client
+        self.scheduler = scheduler
+        self.poll_seconds = poll_seconds
+
+    def _call(self, func, *args, **kwargs):
+        # Wrapped, since batches.create takes an `endpoint` argument too
+        return self.scheduler.retry('chat', lambda: func(*args, **kwargs))
+
+    def submit(self, path: str, metadata: Dict[str, str] = None) -> str:
+        """Upload a job file, start a batch job on it and return its id."""
+        with open(path, 'rb') as f:
+            uploaded = self._call(self.client.files.create,
+                                  file=f,
+                                  purpose='batch')
+        batch = self._call(self.client.batches.create,
+                           input_file_id=uploaded.id,
+                           endpoint=BATCH_ENDPOINT,
+                           completion_window=COMPLETION_WINDOW,
+                           metadata=metadata)
+        print(f"📮 Submitted batch {batch.id} ({path})")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """Poll a batch job until it finishes and return the final batch."""
+        last_progress = None
+        while True:
+            batch = self._call(self.client.batches.retrieve, batch_id)
+            counts = batch.request_counts
+            progress = (batch.status, counts.completed if counts else 0,
+                        counts.failed if counts else 0)
+            if progress != last_progress:
+                done = f", {counts.completed}/{counts.total} done, {counts.failed} failed" if counts else ''
+                print(f"⏳ Batch {batch_id}: {batch.status}{done}")
+                last_progress = progress
+            if batch.status in FINISHED_STATUSES:
+                return batch
+            time.sleep(self.poll_seconds)
+
+    def _read_lines(self, file_id: str) -> List[Dict]:
+        if not file_id:
+            return []
+        content = self._call(self.client.files.content, file_id)
+        return [json.loads(line) for line in content.text.splitlines() if line]
+
+    def results(self, batch) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """
+        Return the successful response bodies and the error messages of a
+        finished batch, each keyed by custom_id. Requests that are in
+        neither (e.g. an expired batch's unfinished ones) never ran.
+        """
+        bodies, errors = {}, {}
+        for line in (self._read_lines(batch.output_file_id) +
+                     self._read_lines(batch.error_file_id)):
+            custom_id = line.get('custom_id')
+            response = line.get('response') or {}
+            body = response.get('body') or {}
+            if response.get('status_code') == 200 and not line.get('error'):
+                bodies[custom_id] = body
+            else:
+                error = line.get('error') or body.get('error') or {}
+                errors[custom_id] = (
+                    error.get('message') if isinstance(error, dict) else
+                    str(error)) or f"status {response.get('status_code')}"
+        if batch.status != 'completed':
+            print(f"⚠️  Batch {batch.id} ended {batch.status}")
+        return bodies, errors
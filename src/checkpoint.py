@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run Checkpoints
+Append-only JSONL checkpoint files that let an interrupted fetch or
+summarization run resume without redoing finished work.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class Checkpoint:
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open a checkpoint file. With resume, records already in the file are
+        loaded and kept; otherwise any previous checkpoint is discarded.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a partially written last line
+                        continue
+                    self.records[entry['key']] = entry['record']
+            print(
+                f"♻️  Resuming from {path} ({len(self.records)} records already done)"
+            )
+
+        self._file = open(path, 'a' if resume else 'w')
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the checkpointed record for key, if any."""
+        return self.records.get(key)
+
+    def append(self, key: str, record: Dict):
+        """Durably append a finished record."""
+        line = json.dumps({'key': key, 'record': record})
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.records[key] = record
+
+    def close(self, remove: bool = False):
+        """Close the file; remove it once the run has completed."""
+        self._file.close()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
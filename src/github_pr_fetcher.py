@@ -7,36 +7,213 @@ filters out unimportant ones, and exports the data to CSV.
 
 import os
 import csv
-import re
+import fnmatch
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
-from github import Github
+from typing import Callable, Dict, List, Tuple
 from dotenv import load_dotenv
-import pandas as pd
+from pr_parser import parse_attachments, parse_pr
+from rate_limiter import get_scheduler
 
 # Load environment variables
 load_dotenv()
 
+GITHUB_API_URL = 'https://api.github.com'
+GITHUB_GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# GitHub search returns at most this many results per query
+SEARCH_RESULT_CAP = 1000
+
+# Largest page size the REST list and search endpoints allow
+PAGE_SIZE = 100
+
+# Search query for the GraphQL engine: one request returns up to 100 PRs
+# with every field the export needs, so no per-PR follow-up call is made
+PR_SEARCH_GRAPHQL = """
+query($searchQuery: String!, $cursor: String) {
+  search(query: $searchQuery, type: ISSUE, first: 100, after: $cursor) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest {
+        number url title body additions deletions state merged createdAt
+        updatedAt
+      }
+    }
+  }
+}
+"""
+
+
+# Exported PR fields, in CSV column order
+PR_FIELDS = [
+    'pr_url', 'title', 'description', 'lines_of_code_changes', 'additions',
+    'deletions', 'created_at', 'updated_at', 'state', 'merged', 'attachments'
+]
+
+# Fields that need the full PR object; the rest come from the search or
+# list payload, so selecting none of these skips the per-PR request
+FULL_PR_FIELDS = {'lines_of_code_changes', 'additions', 'deletions'}
+
+PR_COUNT_GRAPHQL = """
+query($searchQuery: String!) {
+  search(query: $searchQuery, type: ISSUE, first: 1) { issueCount }
+}
+"""
+
+
+def select_fields(fields: List[str] = None) -> List[str]:
+    """
+    Validate requested field names and return them in export order.
+    pr_url is always included since it identifies each PR.
+    """
+    if not fields:
+        return list(PR_FIELDS)
+    unknown = set(fields) - set(PR_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. Expected some of: {', '.join(PR_FIELDS)}"
+        )
+    return [
+        field for field in PR_FIELDS if field == 'pr_url' or field in fields
+    ]
+
+
+class GraphQLPullRequest:
+    """Adapts a GraphQL PullRequest node to the PyGithub attribute names."""
+
+    def __init__(self, node: Dict):
+        self.number = node['number']
+        self.html_url = node['url']
+        self.title = node['title']
+        self.body = node.get('body') or ''
+        self.additions = node['additions']
+        self.deletions = node['deletions']
+        self.created_at = datetime.fromisoformat(node['createdAt'].replace(
+            'Z', '+00:00'))
+        self.updated_at = datetime.fromisoformat(node['updatedAt'].replace(
+            'Z', '+00:00'))
+        # GraphQL reports MERGED as its own state; REST reports it as closed
+        self.state = 'open' if node['state'] == 'OPEN' else 'closed'
+        self.merged = node['merged']
+
 
 class PRAnalyzer:
 
-    def __init__(self, github_token: str):
-        """Initialize the PR analyzer with GitHub token."""
-        self.github = Github(github_token)
+    def __init__(self,
+                 github_token: str,
+                 max_workers: int = 8,
+                 engine: str = 'rest',
+                 graphql_url: str = GITHUB_GRAPHQL_URL,
+                 http_cache=None,
+                 scheduler=None,
+                 api_url: str = GITHUB_API_URL):
+        """
+        Initialize the PR analyzer with GitHub token.
+        max_workers bounds how many PRs are hydrated concurrently.
+        engine selects how PRs are fetched: 'rest' (search + one REST call
+        per PR) or 'graphql' (batched GraphQL search, 100 PRs per request).
+        http_cache is an optional HTTPCache used for conditional requests.
+        scheduler paces and retries GitHub requests (shared by default).
+        api_url is the REST API root, e.g. for GitHub Enterprise Server.
+        """
+        if engine not in ('rest', 'graphql'):
+            raise ValueError(
+                f"Unknown fetch engine '{engine}', expected 'rest' or 'graphql'"
+            )
+        self.github_token = github_token
+        self.engine = engine
+        self.graphql_url = graphql_url
+        self.max_workers = max(1, max_workers)
+        self.http_cache = http_cache
+        self.scheduler = scheduler or get_scheduler()
+        self.metrics = self.scheduler.metrics
+
+        # PyGithub and requests are imported where they are used, so
+        # importing this module (e.g. for --help) stays cheap
+        from github import Github
+        from github.Requester import Requester
+
+        # PyGithub picks its connection classes when the client is created,
+        # so swapping them in only for this constructor keeps the adapters
+        # scoped to this analyzer
+        Requester.injectConnectionClasses(*self._connection_classes())
+        try:
+            # Size the HTTP connection pool to match the worker count so
+            # concurrent requests reuse connections instead of discarding
+            # them. PyGithub's own throttle (0.25s between any two
+            # requests) is off: it would serialise the workers, and the
+            # rate-limit scheduler already paces every request
+            self.github = Github(github_token,
+                                 base_url=api_url,
+                                 per_page=PAGE_SIZE,
+                                 pool_size=self.max_workers,
+                                 seconds_between_requests=None)
+        finally:
+            Requester.resetConnectionClasses()
         self.user = self.github.get_user()
 
-    def get_pr_attachments(self, pr) -> List[str]:
-        """Extract attachment URLs from PR body."""
-        attachments = []
-        if pr.body:
-            # Look for markdown image syntax and links
-            image_pattern = r'!\[.*?\]\((https?://[^\s\)]+)\)'
-            link_pattern = r'\[.*?\]\((https?://[^\s\)]+)\)'
+        self._graphql_session = None
+        if engine == 'graphql':
+            import requests
+            from rate_limiter import ScheduledHTTPAdapter
+            self._graphql_session = requests.Session()
+            self._graphql_session.headers[
+                'Authorization'] = f"bearer {github_token}"
+            adapter = ScheduledHTTPAdapter(scheduler=self.scheduler,
+                                           pool_connections=self.max_workers,
+                                           pool_maxsize=self.max_workers)
+            self._graphql_session.mount('http://', adapter)
+            self._graphql_session.mount('https://', adapter)
 
-            attachments.extend(re.findall(image_pattern, pr.body))
-            attachments.extend(re.findall(link_pattern, pr.body))
+    def _connection_classes(self):
+        """
+        Build PyGithub connection classes whose sessions pace every request
+        through the scheduler and, if configured, the HTTP cache.
+        """
+        from github.Requester import (HTTPRequestsConnectionClass,
+                                      HTTPSRequestsConnectionClass)
+        from rate_limiter import ScheduledHTTPAdapter
 
-        return list(set(attachments))  # Remove duplicates
+        adapter_class = ScheduledHTTPAdapter
+        adapter_kwargs = {'scheduler': self.scheduler}
+        if self.http_cache:
+            from http_cache import CachingHTTPAdapter
+            # Cache lookups wrap the paced request, so 304s are paced too
+            adapter_class = type('CachingScheduledHTTPAdapter',
+                                 (CachingHTTPAdapter, ScheduledHTTPAdapter),
+                                 {})
+            adapter_kwargs['cache'] = self.http_cache
+
+        def mount_adapter(connection):
+            connection.adapter = adapter_class(
+                max_retries=connection.retry,
+                pool_connections=connection.pool_size,
+                pool_maxsize=connection.pool_size,
+                **adapter_kwargs)
+            connection.session.mount(f"{connection.protocol}://",
+                                     connection.adapter)
+
+        class HTTPConnection(HTTPRequestsConnectionClass):
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                mount_adapter(self)
+
+        class HTTPSConnection(HTTPSRequestsConnectionClass):
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                mount_adapter(self)
+
+        return HTTPConnection, HTTPSConnection
+
+    def get_pr_attachments(self, pr) -> List[str]:
+        """Extract attachment URLs from PR body."""
+        return parse_attachments(pr.body or '')
 
     def extract_important_description(self, pr_body: str) -> str:
         """
@@ -45,67 +222,104 @@ class PRAnalyzer:
         """
         if not pr_body:
             return ""
+        return parse_pr('', pr_body).important_description()
 
-        # Split the body into lines for easier processing
-        lines = pr_body.split('\n')
-
-        description_content = []
-        test_plan_content = []
-        current_section = None
-
-        for line in lines:
-            line_stripped = line.strip()
-
-            # Detect section headers
-            if line_stripped == "## Description":
-                current_section = "description"
-                continue
-            elif line_stripped == "## Test Plan":
-                current_section = "test_plan"
-                continue
-            elif line_stripped.startswith(
-                    "## Checklist") or line_stripped.startswith(
-                        "##") and "checklist" in line_stripped.lower():
-                current_section = None  # Stop processing
-                break
-            elif line_stripped.startswith("<!---") or line_stripped.startswith(
-                    "<!--"):
-                current_section = None  # Stop at HTML comments
-                break
+    def _build_pr_data(self, pr, fields: List[str] = None) -> Dict:
+        """
+        Build the exported record for a PR object, computing only the given
+        fields (all by default). Line counts need a fully loaded PR; the
+        other fields also work on search results and list items.
+        """
+        fields = fields or PR_FIELDS
+        started = time.perf_counter()
+        additions = deletions = 0
 
-            # Collect content for current section
-            if current_section == "description":
-                description_content.append(line)
-            elif current_section == "test_plan":
-                test_plan_content.append(line)
+        if FULL_PR_FIELDS.intersection(fields):
+            # Get line changes (this requires an additional API call)
+            try:
+                additions = pr.additions
+                deletions = pr.deletions
+            except Exception as e:
+                print(
+                    f"Warning: Could not get line count for PR #{pr.number}: {e}"
+                )
+                additions = deletions = 0
 
-        # Clean and combine the content
-        result_parts = []
+        # Description and attachments come from one pass over the body
+        parsed = None
+        if 'description' in fields or 'attachments' in fields:
+            parsed = parse_pr(pr.title, pr.body or '')
 
-        # Process description
-        desc_text = '\n'.join(description_content).strip()
-        if desc_text and desc_text.lower() not in ['todo', 'tbd', 'n/a', '']:
-            result_parts.append(f"Description: {desc_text}")
+        values = {
+            'pr_url': lambda: pr.html_url,
+            'title': lambda: pr.title,
+            'description':
+            lambda: parsed.important_description() if pr.body else '',
+            'lines_of_code_changes': lambda: additions + deletions,
+            'additions': lambda: additions,
+            'deletions': lambda: deletions,
+            'created_at': lambda: pr.created_at.isoformat(),
+            'updated_at': lambda: pr.updated_at.isoformat(),
+            'state': lambda: pr.state,
+            'merged': lambda: self._is_merged(pr),
+            'attachments': lambda: '; '.join(parsed.attachments)
+        }
+        pr_data = {field: values[field]() for field in fields}
+        self.metrics.record_stage('parse', time.perf_counter() - started)
+        return pr_data
 
-        # Process test plan
-        test_text = '\n'.join(test_plan_content).strip()
-        if test_text and test_text.lower() not in ['todo', 'tbd', 'n/a', '']:
-            result_parts.append(f"Test Plan: {test_text}")
+    @staticmethod
+    def _is_merged(pr) -> bool:
+        """Merged flag of a PR, search result or list item without lazy loads."""
+        if isinstance(pr, GraphQLPullRequest):
+            return pr.merged
+        # Search results are issues carrying merged_at in their pull_request
+        pull_request = getattr(pr, 'pull_request', None)
+        if pull_request is not None:
+            return pull_request.merged_at is not None
+        return pr.merged_at is not None
 
-        return '\n\n'.join(
-            result_parts
-        ) if result_parts else "No meaningful description available"
+    @staticmethod
+    def _report_added(pr_data: Dict):
+        """Print a progress line for a fetched PR record."""
+        if 'lines_of_code_changes' in pr_data:
+            print(
+                f"Added PR: {pr_data.get('title', pr_data['pr_url'])} ({pr_data['lines_of_code_changes']} lines changed)"
+            )
+        else:
+            print(f"Added PR: {pr_data.get('title', pr_data['pr_url'])}")
 
     def fetch_user_prs(self,
                        repo_name: str,
                        github_username: str = None,
-                       days: int = 180) -> List[Dict]:
+                       days: int = 180,
+                       updated_since: datetime = None,
+                       on_pr: Callable[[Dict], None] = None,
+                       checkpoint=None,
+                       fields: List[str] = None) -> List[Dict]:
         """
         Fetch PRs created by the specified user in the specified repo
-        within the past N days.
+        within the past N days. If updated_since is given, only PRs
+        updated at or after that time are returned. If on_pr is given, it
+        is called with each record as soon as it has been fetched. With a
+        Checkpoint, each record is appended to it as it is fetched and PRs
+        already in it are not fetched again. fields limits each record to
+        those PR_FIELDS; without line counts, no per-PR request is made.
         """
+        fields = select_fields(fields)
+
+        # A failed engine falls back to another one, which refetches the
+        # same PRs; only hand each PR to on_pr once
+        emitted = set()
+
+        def emit(pr_data: Dict):
+            if on_pr and pr_data['pr_url'] not in emitted:
+                emitted.add(pr_data['pr_url'])
+                on_pr(pr_data)
+
         try:
-            repo = self.github.get_repo(repo_name)
+            repo = self.scheduler.retry('core', self.github.get_repo,
+                                        repo_name)
         except Exception as e:
             print(f"Error accessing repository {repo_name}: {e}")
             return []
@@ -121,70 +335,91 @@ class PRAnalyzer:
         )
 
         # Use GitHub's search API to filter PRs by author - much more efficient!
-        search_query = f"repo:{repo_name} is:pr author:{target_username} created:>{threshold_date.strftime('%Y-%m-%d')}"
+        base_query = f"repo:{repo_name} is:pr author:{target_username}"
+        if updated_since:
+            base_query += f" updated:>={updated_since.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+        end_date = datetime.now(timezone.utc)
+
+        if self.engine == 'graphql':
+            try:
+                emit_lock = threading.Lock()
+
+                def locked_emit(pr_data):
+                    with emit_lock:
+                        emit(pr_data)
+
+                def fetch_window(window):
+                    return self._fetch_user_prs_graphql(window[0], locked_emit,
+                                                        checkpoint, fields)
+
+                # Each GraphQL page carries complete records, so the whole
+                # fetch counts as the search stage
+                with self.metrics.stage('search'):
+                    windows = self._created_windows(base_query, threshold_date,
+                                                    end_date,
+                                                    self._graphql_count)
+                    print(
+                        f"Found {sum(total for _, total in windows)} PRs matching criteria"
+                    )
+                    user_prs = []
+                    with ThreadPoolExecutor(
+                            max_workers=self.max_workers) as pool:
+                        for prs in pool.map(fetch_window, windows):
+                            user_prs.extend(prs)
+                return user_prs
+            except Exception as e:
+                print(f"Error fetching PRs via GraphQL: {e}")
+                print("Falling back to the REST search...")
 
         try:
-            # Search for PRs matching our criteria
-            issues = self.github.search_issues(query=search_query,
-                                               sort='created',
-                                               order='desc')
-            total_count = issues.totalCount
-            print(f"Found {total_count} PRs matching criteria")
+            # Search for PRs matching our criteria, split into created-date
+            # windows small enough to get past the search result cap
+            searches = {}
 
-            user_prs = []
-            processed_count = 0
+            def count(query: str) -> int:
+                searches[query] = self.github.search_issues(query=query,
+                                                            sort='created',
+                                                            order='desc')
+                return self.scheduler.retry(
+                    'search', lambda: searches[query].totalCount)
 
-            for issue in issues:
-                processed_count += 1
-                if processed_count % 5 == 0:
-                    print(f"Processed {processed_count}/{total_count} PRs...")
+            with self.metrics.stage('search'):
+                windows = self._created_windows(base_query, threshold_date,
+                                                end_date, count)
+                total_count = sum(total for _, total in windows)
+                print(f"Found {total_count} PRs matching criteria")
 
-                    # Convert issue to PR object to get PR-specific data
-                pr = repo.get_pull(issue.number)
+                def list_hits(window):
+                    issues = searches[window[0]]
+                    return self.scheduler.retry('search', lambda: list(issues))
 
-                # Get attachments
-                attachments = self.get_pr_attachments(pr)
+                # Page through all windows concurrently, then hydrate search
+                # hits into full PR objects concurrently; map() yields results
+                # in search order regardless of completion order
+                hits = []
+                seen = set()
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    for window_hits in pool.map(list_hits, windows):
+                        for issue in window_hits:
+                            if issue.number not in seen:
+                                seen.add(issue.number)
+                                hits.append(issue)
+            user_prs = []
 
-                # Get line changes (this requires an additional API call)
-                try:
-                    lines_changed = pr.additions + pr.deletions
-                    additions = pr.additions
-                    deletions = pr.deletions
-                except Exception as e:
-                    print(
-                        f"Warning: Could not get line count for PR #{pr.number}: {e}"
-                    )
-                    lines_changed = 0
-                    additions = 0
-                    deletions = 0
-
-                pr_data = {
-                    'pr_url':
-                    pr.html_url,
-                    'title':
-                    pr.title,
-                    'description':
-                    self.extract_important_description(pr.body or ''),
-                    'lines_of_code_changes':
-                    lines_changed,
-                    'additions':
-                    additions,
-                    'deletions':
-                    deletions,
-                    'created_at':
-                    pr.created_at.isoformat(),
-                    'state':
-                    pr.state,
-                    'merged':
-                    pr.merged,
-                    'attachments':
-                    '; '.join(attachments) if attachments else ''
-                }
+            with self.metrics.stage('hydrate'):
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    hydrated = pool.map(
+                        lambda issue: self._hydrate_pr(repo, issue, checkpoint,
+                                                       fields), hits)
 
-                user_prs.append(pr_data)
-                print(
-                    f"Added PR: {pr.title} ({pr_data['lines_of_code_changes']} lines changed)"
-                )
+                    for pr_data in hydrated:
+                        user_prs.append(pr_data)
+                        emit(pr_data)
+                        self._report_added(pr_data)
+                        if len(user_prs) % 5 == 0:
+                            print(
+                                f"Processed {len(user_prs)}/{total_count} PRs..."
+                            )
 
             return user_prs
 
@@ -193,53 +428,332 @@ class PRAnalyzer:
             print("Falling back to the original method...")
             # Fallback to original method if search fails
             return self._fetch_user_prs_fallback(repo, target_username,
-                                                 threshold_date)
+                                                 threshold_date, emit,
+                                                 checkpoint, fields)
 
-    def _fetch_user_prs_fallback(self, repo, target_username: str,
-                                 threshold_date) -> List[Dict]:
-        """Fallback method using the original approach."""
-        print("Using fallback method - this may be slower...")
+    def _created_windows(self, base_query: str, start: datetime,
+                         end: datetime,
+                         count: Callable[[str], int]) -> List[Tuple[str, int]]:
+        """
+        Split the created-date range [start, end] into search queries that
+        each match at most SEARCH_RESULT_CAP results, bisecting any window
+        over the cap. Windows at the same depth are counted concurrently.
+        Returns (query, total) pairs, newest window first.
+        """
+        windows = []
+        pending = [(start.replace(microsecond=0), end.replace(microsecond=0))]
 
-        # Get all PRs (open and closed) created by the user
-        prs = repo.get_pulls(state='all', sort='created', direction='desc')
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending:
+                queries = [
+                    f"{base_query} created:{window_start.strftime('%Y-%m-%dT%H:%M:%SZ')}..{window_end.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+                    for window_start, window_end in pending
+                ]
+                totals = list(pool.map(count, queries))
 
-        user_prs = []
-        processed_count = 0
+                split = []
+                for (window_start, window_end), query, total in zip(
+                        pending, queries, totals):
+                    if (total > SEARCH_RESULT_CAP
+                            and window_end - window_start > timedelta(
+                                seconds=1)):
+                        middle = (window_start +
+                                  (window_end - window_start) / 2).replace(
+                                      microsecond=0)
+                        # Ranges are inclusive, so the halves must not share
+                        # their boundary second
+                        split.append((middle + timedelta(seconds=1),
+                                      window_end))
+                        split.append((window_start, middle))
+                    elif total:
+                        if total > SEARCH_RESULT_CAP:
+                            print(
+                                f"Warning: {total} PRs created within one second; only {SEARCH_RESULT_CAP} can be fetched"
+                            )
+                        windows.append((window_start, query, total))
 
-        for pr in prs:
-            processed_count += 1
-            if processed_count % 50 == 0:  # Less frequent updates for fallback
-                print(f"Processed {processed_count} PRs...")
+                if split:
+                    print(
+                        f"Splitting {len(split) // 2} search window(s) over the {SEARCH_RESULT_CAP}-result cap..."
+                    )
+                pending = split
 
-            # Check if PR is within date range
-            if pr.created_at < threshold_date:
-                break
+        windows.sort(key=lambda window: window[0], reverse=True)
+        return [(query, total) for _, query, total in windows]
 
-                # Check if PR was created by the target user
-            if pr.user.login != target_username:
-                continue
+    def _hydrate_pr(self, repo, item, checkpoint=None,
+                    fields: List[str] = None) -> Dict:
+        """
+        Build one PR's record from a search result or list item, loading
+        the full PR only when a requested field needs it. A checkpointed
+        record is reused if it has every requested field.
+        """
+        fields = fields or PR_FIELDS
+        if checkpoint:
+            done = checkpoint.get(item.html_url)
+            if done and all(field in done for field in fields):
+                return {field: done[field] for field in fields}
+
+        if FULL_PR_FIELDS.intersection(fields):
+            item = self.scheduler.retry('core', repo.get_pull, item.number)
+        pr_data = self._build_pr_data(item, fields)
+        if checkpoint:
+            checkpoint.append(pr_data['pr_url'], pr_data)
+        return pr_data
 
-            # Get attachments
-            attachments = self.get_pr_attachments(pr)
-
-            pr_data = {
-                'pr_url': pr.html_url,
-                'title': pr.title,
-                'description': self.extract_important_description(pr.body
-                                                                  or ''),
-                'lines_of_code_changes': pr.additions + pr.deletions,
-                'additions': pr.additions,
-                'deletions': pr.deletions,
-                'created_at': pr.created_at.isoformat(),
-                'state': pr.state,
-                'merged': pr.merged,
-                'attachments': '; '.join(attachments) if attachments else ''
-            }
-
-            user_prs.append(pr_data)
+    def sync_user_prs(self,
+                      store,
+                      repo_name: str,
+                      github_username: str = None,
+                      days: int = 180,
+                      checkpoint=None,
+                      fields: List[str] = None) -> List[Dict]:
+        """
+        Incrementally sync the user's PRs into a PRStore and return the
+        stored PRs for the past N days. Only PRs updated since the last
+        sync are fetched, unless the requested window reaches further back
+        than the previous one. The store always keeps complete records;
+        fields only limits the returned ones.
+        """
+        fields = select_fields(fields)
+
+        def project(prs: List[Dict]) -> List[Dict]:
+            return [{field: pr[field] for field in fields if field in pr}
+                    for pr in prs]
+
+        target_username = github_username or self.user.login
+        sync_started = datetime.now(timezone.utc)
+        window_start = sync_started - timedelta(days=days)
+
+        # Verify access up front so a failure doesn't advance the sync state
+        try:
+            self.scheduler.retry('core', self.github.get_repo, repo_name)
+        except Exception as e:
+            print(f"Error accessing repository {repo_name}: {e}")
+            return project(
+                store.get_prs(repo_name, target_username, window_start))
+
+        state = store.get_sync_state(repo_name, target_username)
+        updated_since = None
+        if state and state['window_start'] <= window_start:
+            updated_since = state['synced_at']
             print(
-                f"Added PR: {pr.title} ({pr_data['lines_of_code_changes']} lines changed)"
+                f"Incremental sync: fetching PRs updated since {updated_since.strftime('%Y-%m-%d %H:%M:%S')} UTC"
             )
+        else:
+            print("Full sync: no previous sync covers this time range")
+
+        prs = self.fetch_user_prs(repo_name,
+                                  target_username,
+                                  days,
+                                  updated_since,
+                                  checkpoint=checkpoint)
+        store.upsert_prs(repo_name, target_username, prs)
+        store.set_sync_state(repo_name, target_username, sync_started,
+                             window_start)
+        print(f"Synced {len(prs)} new or updated PRs into {store.path}")
+
+        return project(store.get_prs(repo_name, target_username,
+                                     window_start))
+
+    def expand_repos(self, patterns: List[str]) -> List[str]:
+        """
+        Expand repo names and globs (e.g. 'org/*' or 'org/api-*') into a
+        sorted list of 'owner/repository' names.
+        """
+        repos = set()
+        for pattern in patterns:
+            if not any(char in pattern for char in '*?['):
+                repos.add(pattern)
+                continue
+
+            owner = pattern.split('/', 1)[0]
+            try:
+                owner_repos = self.scheduler.retry(
+                    'core', lambda: list(
+                        self.github.get_organization(owner).get_repos()))
+            except Exception:
+                # Not an organization: fall back to a user's repositories
+                owner_repos = self.scheduler.retry(
+                    'core',
+                    lambda: list(self.github.get_user(owner).get_repos()))
+            matched = [
+                repo.full_name for repo in owner_repos
+                if fnmatch.fnmatch(repo.full_name, pattern)
+            ]
+            print(f"Pattern '{pattern}' matched {len(matched)} repositories")
+            repos.update(matched)
+        return sorted(repos)
+
+    def fetch_many(self,
+                   repos: List[str],
+                   authors: List[str],
+                   days: int = 180,
+                   on_pr: Callable[[Dict], None] = None,
+                   checkpoint=None,
+                   store=None,
+                   fanout_workers: int = 4,
+                   fields: List[str] = None) -> List[Dict]:
+        """
+        Fetch PRs for every (repo, author) pair, running up to
+        fanout_workers searches in parallel. All pairs share this
+        analyzer's client, rate-limit scheduler and caches. Each record
+        gets 'repo' and 'author' fields; records are ordered by pair.
+        """
+        pairs = [(repo, author) for repo in repos for author in authors]
+        print(
+            f"Fanning out over {len(repos)} repositories x {len(authors)} authors ({len(pairs)} searches)"
+        )
+        lock = threading.Lock()
+
+        def tag(pr_data: Dict, repo: str, author: str) -> Dict:
+            return {**pr_data, 'repo': repo, 'author': author}
+
+        def fetch_pair(pair) -> List[Dict]:
+            repo, author = pair
+
+            def emit(pr_data: Dict):
+                if on_pr:
+                    # Keep a single consumer call at a time across pairs
+                    with lock:
+                        on_pr(tag(pr_data, repo, author))
+
+            if store:
+                prs = self.sync_user_prs(store, repo, author, days,
+                                         checkpoint, fields)
+                for pr_data in prs:
+                    emit(pr_data)
+            else:
+                prs = self.fetch_user_prs(repo,
+                                          author,
+                                          days,
+                                          on_pr=emit,
+                                          checkpoint=checkpoint,
+                                          fields=fields)
+            return [tag(pr_data, repo, author) for pr_data in prs]
+
+        all_prs = []
+        with ThreadPoolExecutor(max_workers=max(1, fanout_workers)) as pool:
+            for prs in pool.map(fetch_pair, pairs):
+                all_prs.extend(prs)
+        return all_prs
+
+    def _graphql(self, query: str, variables: Dict) -> Dict:
+        """Run a GraphQL query and return its data, raising on errors."""
+
+        def post():
+            response = self._graphql_session.post(self.graphql_url,
+                                                  json={
+                                                      'query': query,
+                                                      'variables': variables
+                                                  },
+                                                  timeout=30)
+            response.raise_for_status()
+            return response.json()
+
+        payload = self.scheduler.retry('graphql', post)
+        if payload.get('errors'):
+            raise RuntimeError(payload['errors'][0].get('message'))
+        return payload['data']
+
+    def _graphql_count(self, search_query: str) -> int:
+        """Number of results a GraphQL search query matches."""
+        return self._graphql(PR_COUNT_GRAPHQL,
+                             {'searchQuery': search_query})['search']['issueCount']
+
+    def _fetch_user_prs_graphql(self,
+                                search_query: str,
+                                on_pr: Callable[[Dict], None] = None,
+                                checkpoint=None,
+                                fields: List[str] = None) -> List[Dict]:
+        """Fetch PRs with batched GraphQL search requests (100 PRs each)."""
+        user_prs = []
+        cursor = None
+
+        while True:
+            search = self._graphql(PR_SEARCH_GRAPHQL, {
+                'searchQuery': search_query,
+                'cursor': cursor
+            })['search']
+
+            for node in search['nodes']:
+                # Skip non-PR nodes (the search type also covers issues)
+                if not node:
+                    continue
+                pr_data = self._build_pr_data(GraphQLPullRequest(node),
+                                              fields)
+                user_prs.append(pr_data)
+                if checkpoint:
+                    checkpoint.append(pr_data['pr_url'], pr_data)
+                if on_pr:
+                    on_pr(pr_data)
+                self._report_added(pr_data)
+
+            if not search['pageInfo']['hasNextPage']:
+                break
+            cursor = search['pageInfo']['endCursor']
+
+        return user_prs
+
+    def _fetch_user_prs_fallback(
+            self,
+            repo,
+            target_username: str,
+            threshold_date,
+            on_pr: Callable[[Dict], None] = None,
+            checkpoint=None,
+            fields: List[str] = None) -> List[Dict]:
+        """
+        Fallback that lists the repository's PRs page by page. Author and
+        date are filtered on the list payload, so only matching PRs are
+        hydrated, concurrently while later pages are still being scanned.
+        """
+        print("Using fallback method - this may be slower...")
+
+        # Get all PRs (open and closed), newest first
+        prs = repo.get_pulls(state='all', sort='created', direction='desc')
+
+        futures = []
+        scanned = 0
+        page_index = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with self.metrics.stage('search'):
+                    page = self.scheduler.retry('core', prs.get_page,
+                                                page_index)
+                page_index += 1
+                reached_threshold = not page
+
+                for pr in page:
+                    # Check if PR is within date range
+                    if pr.created_at < threshold_date:
+                        reached_threshold = True
+                        break
+                    scanned += 1
+
+                    # Check if PR was created by the target user
+                    if pr.user.login == target_username:
+                        futures.append(
+                            pool.submit(self._hydrate_pr, repo, pr,
+                                        checkpoint, fields))
+
+                print(
+                    f"Scanned page {page_index} ({scanned} PRs, {len(futures)} by {target_username})..."
+                )
+                if reached_threshold or len(page) < PAGE_SIZE:
+                    break
+
+            user_prs = []
+            hydrate_started = time.perf_counter()
+            for future in futures:
+                pr_data = future.result()
+                user_prs.append(pr_data)
+                if on_pr:
+                    on_pr(pr_data)
+                self._report_added(pr_data)
+            self.metrics.record_stage('hydrate',
+                                      time.perf_counter() - hydrate_started)
 
         return user_prs
 
@@ -255,21 +769,105 @@ class PRAnalyzer:
         import os
         os.makedirs('output', exist_ok=True)
 
-        # Create DataFrame and export detailed CSV
-        df = pd.DataFrame(prs)
-        df.to_csv(filename, index=False, quoting=csv.QUOTE_ALL)
+        # Stream the records straight to the detailed CSV
+        from pr_records import write_pr_csv
+        with self.metrics.stage('write'):
+            write_pr_csv(filename, prs, quoting=csv.QUOTE_ALL)
         print(f"Exported {len(prs)} PRs to {filename}")
         return filename
 
+    def export_dataset(self,
+                       prs: List[Dict],
+                       csv_file: str,
+                       fmt: str = 'parquet',
+                       defaults: Dict[str, str] = None) -> str:
+        """
+        Write a columnar copy of a detailed CSV export, partitioned by repo
+        and month (see pr_columnar). defaults supply repo and author when
+        the records don't carry them. Returns the dataset path, or None if
+        pyarrow is not installed.
+        """
+        from pr_columnar import dataset_path, write_dataset
+        try:
+            with self.metrics.stage('write'):
+                path = write_dataset(prs, dataset_path(csv_file, fmt), fmt,
+                                     defaults)
+        except ImportError as e:
+            print(f"❌ {e}")
+            return None
+        print(f"Exported {len(prs)} PRs to {path}")
+        return path
 
-def main():
-    """Main function to run the PR analyzer."""
+    def update_rollups(self,
+                       prs: List[Dict],
+                       path: str,
+                       fields: List[str],
+                       defaults: Dict[str, str] = None) -> int:
+        """
+        Fold fetched PRs into the rollup index at path (see pr_rollups).
+        Only new PRs and PRs whose counts or state changed touch their
+        buckets. Returns the number of PRs indexed, or None if the
+        exported fields lack what the index needs.
+        """
+        from pr_rollups import ROLLUP_FIELDS, RollupIndex
+        missing = [field for field in ROLLUP_FIELDS if field not in fields]
+        if missing:
+            print(f"Skipping rollup index: missing fields {', '.join(missing)}")
+            return None
+        index = RollupIndex(path)
+        try:
+            with self.metrics.stage('write'):
+                changed = index.add_prs(prs, defaults)
+        finally:
+            index.close()
+        print(f"Updated rollup index {path}: {changed} new or changed PRs")
+        return changed
+
+    def export_grouped_csvs(self, prs: List[Dict], column: str,
+                            filename_template: str) -> List[str]:
+        """
+        Export one detailed CSV per distinct value of column. The template
+        is formatted with the value (slashes replaced), e.g.
+        'output/by_repo/pr_{}_detailed.csv'.
+        """
+        groups = {}
+        for pr in prs:
+            groups.setdefault(pr[column], []).append(pr)
+
+        filenames = []
+        for value, group in sorted(groups.items()):
+            filename = filename_template.format(value.replace('/', '_'))
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            filenames.append(self.export_to_csv(group, filename))
+        return filenames
+
+
+def main(on_pr: Callable[[Dict], None] = None,
+         resume: bool = False,
+         fields: List[str] = None):
+    """
+    Main function to run the PR analyzer. If on_pr is given, each PR
+    record is passed to it as soon as it is available. With resume, PRs
+    saved to the checkpoint by an interrupted run are not fetched again.
+    fields limits the exported columns (all PR_FIELDS by default).
+    """
     # Get configuration from environment variables
     github_token = os.getenv('GITHUB_TOKEN')
-    repo_name = os.getenv('GITHUB_REPO')
+    repo_name = os.getenv('GITHUB_REPO')  # Comma-separated names or globs
     github_username = os.getenv(
-        'GITHUB_USERNAME')  # Optional: specific username to search for
+        'GITHUB_USERNAME')  # Optional: specific username(s) to search for
     days_str = os.getenv('DAYS', '14')  # Default to 14 days if not specified
+    workers_str = os.getenv('FETCH_WORKERS', '8')  # Concurrent PR requests
+    engine = os.getenv('FETCH_ENGINE', 'rest').lower()  # 'rest' or 'graphql'
+    api_url = os.getenv('GITHUB_API_URL', GITHUB_API_URL)
+    graphql_url = os.getenv('GITHUB_GRAPHQL_URL', GITHUB_GRAPHQL_URL)
+    store_path = os.getenv('PR_STORE')  # Optional: SQLite store for syncs
+    cache_path = os.getenv('GITHUB_CACHE_PATH',
+                           'output/.cache/github_http.sqlite')
+    cache_max_mb_str = os.getenv('GITHUB_CACHE_MAX_MB', '200')  # 0 disables
+    fanout_workers_str = os.getenv('FANOUT_WORKERS', '4')  # Parallel searches
+    columnar_format = os.getenv('COLUMNAR_FORMAT', '').lower()  # Optional
+    rollup_path = os.getenv('ROLLUP_INDEX')  # Optional: SQLite aggregates
 
     if not github_token:
         print("Error: GITHUB_TOKEN environment variable is required.")
@@ -302,20 +900,128 @@ def main():
         print(f"Error: DAYS must be a valid integer, got '{days_str}'.")
         return
 
+    try:
+        max_workers = int(workers_str)
+        if max_workers <= 0:
+            print("Error: FETCH_WORKERS must be a positive integer.")
+            return
+    except ValueError:
+        print(
+            f"Error: FETCH_WORKERS must be a valid integer, got '{workers_str}'."
+        )
+        return
+
+    try:
+        fanout_workers = int(fanout_workers_str)
+        if fanout_workers <= 0:
+            print("Error: FANOUT_WORKERS must be a positive integer.")
+            return
+    except ValueError:
+        print(
+            f"Error: FANOUT_WORKERS must be a valid integer, got '{fanout_workers_str}'."
+        )
+        return
+
+    if engine not in ('rest', 'graphql'):
+        print(f"Error: FETCH_ENGINE must be 'rest' or 'graphql', got '{engine}'.")
+        return
+
+    if columnar_format not in ('', 'parquet', 'feather'):
+        print(
+            f"Error: COLUMNAR_FORMAT must be 'parquet' or 'feather', got '{columnar_format}'."
+        )
+        return
+
+    try:
+        cache_max_mb = float(cache_max_mb_str)
+    except ValueError:
+        print(
+            f"Error: GITHUB_CACHE_MAX_MB must be a number, got '{cache_max_mb_str}'."
+        )
+        return
+
+    try:
+        fields = select_fields(fields)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    http_cache = None
+    if cache_max_mb > 0:
+        from http_cache import HTTPCache
+        http_cache = HTTPCache(cache_path, int(cache_max_mb * 1024 * 1024))
+
     try:
         # Initialize analyzer
-        analyzer = PRAnalyzer(github_token)
+        analyzer = PRAnalyzer(github_token,
+                              max_workers,
+                              engine,
+                              graphql_url,
+                              http_cache,
+                              api_url=api_url)
+
+        # Expand repo globs and author lists; more than one of either
+        # switches to fan-out mode
+        repos = analyzer.expand_repos(
+            [name.strip() for name in repo_name.split(',') if name.strip()])
+        authors = [
+            name.strip() for name in (github_username or '').split(',')
+            if name.strip()
+        ] or [analyzer.user.login]
+        fanout = len(repos) > 1 or len(authors) > 1
+
+        if not repos:
+            print(f"Error: GITHUB_REPO '{repo_name}' matched no repositories.")
+            return None
 
         # Show which user we're searching for and time range
-        target_user = github_username or analyzer.user.login
-        print(f"Searching for PRs created by: {target_user}")
+        print(f"Searching for PRs created by: {', '.join(authors)}")
         print(f"Time range: Past {days} day(s)")
 
-        # Fetch PRs
-        prs = analyzer.fetch_user_prs(repo_name, github_username, days)
+        # Every fetched PR is appended to a checkpoint so an interrupted run
+        # can resume where it stopped
+        from checkpoint import Checkpoint
+        if fanout:
+            run_key = hashlib.sha1('|'.join(repos + ['@'] + authors).encode()
+                                   ).hexdigest()[:12]
+            checkpoint_name = f"fetch_fanout_{run_key}_{days}d.jsonl"
+        else:
+            checkpoint_name = f"fetch_{repos[0].replace('/', '_')}_{authors[0]}_{days}d.jsonl"
+        checkpoint = Checkpoint(f"output/checkpoints/{checkpoint_name}",
+                                resume)
+
+        # Fetch PRs, incrementally through the local store if configured
+        store = None
+        if store_path:
+            from pr_store import PRStore
+            store = PRStore(store_path)
+
+        try:
+            if fanout:
+                prs = analyzer.fetch_many(repos, authors, days, on_pr,
+                                          checkpoint, store, fanout_workers,
+                                          fields)
+            elif store:
+                prs = analyzer.sync_user_prs(store, repos[0], authors[0],
+                                             days, checkpoint, fields)
+                # Stored PRs are only known once the sync completes
+                if on_pr:
+                    for pr_data in prs:
+                        on_pr(pr_data)
+            else:
+                prs = analyzer.fetch_user_prs(repos[0],
+                                              authors[0],
+                                              days,
+                                              on_pr=on_pr,
+                                              checkpoint=checkpoint,
+                                              fields=fields)
+        finally:
+            if store:
+                store.close()
 
         if not prs:
             print("No PRs found matching the criteria.")
+            checkpoint.close(remove=True)
             return None
 
         # Calculate date range for filename
@@ -329,16 +1035,45 @@ def main():
         # Export to detailed CSV with date range in filename to output folder
         filename = f'output/pr_{start_str}_{end_str}_detailed.csv'
         csv_file = analyzer.export_to_csv(prs, filename)
+        checkpoint.close(remove=csv_file is not None)
+        if csv_file and columnar_format:
+            analyzer.export_dataset(
+                prs, csv_file, columnar_format,
+                {} if fanout else {'repo': repos[0], 'author': authors[0]})
+        if rollup_path:
+            analyzer.update_rollups(
+                prs, rollup_path, fields,
+                {} if fanout else {'repo': repos[0], 'author': authors[0]})
+
+        # In fan-out mode, also split the combined data per repo and author
+        if fanout:
+            analyzer.export_grouped_csvs(
+                prs, 'repo', f'output/by_repo/pr_{start_str}_{end_str}_{{}}_detailed.csv')
+            analyzer.export_grouped_csvs(
+                prs, 'author', f'output/by_author/pr_{start_str}_{end_str}_{{}}_detailed.csv')
 
         # Print summary
         print(f"\nSummary:")
         print(f"Total PRs found: {len(prs)}")
-        print(
-            f"Total lines changed: {sum(pr['lines_of_code_changes'] for pr in prs)}"
-        )
-        print(
-            f"Average lines per PR: {sum(pr['lines_of_code_changes'] for pr in prs) / len(prs):.1f}"
-        )
+        if 'lines_of_code_changes' in fields:
+            print(
+                f"Total lines changed: {sum(pr['lines_of_code_changes'] for pr in prs)}"
+            )
+            print(
+                f"Average lines per PR: {sum(pr['lines_of_code_changes'] for pr in prs) / len(prs):.1f}"
+            )
+        if http_cache:
+            print(
+                f"HTTP cache: {http_cache.hits} hits (304 Not Modified), {http_cache.misses} misses"
+            )
+            analyzer.metrics.increment('http_cache_hits', http_cache.hits)
+            analyzer.metrics.increment('http_cache_misses', http_cache.misses)
+
+        # Machine-readable timings, latencies and retries for this run; each
+        # stage writes its own file, so a later summarize run keeps these
+        analyzer.metrics.increment('prs_fetched', len(prs))
+        analyzer.metrics.write(
+            csv_file.replace('_detailed.csv', '_fetch_metrics.json'))
 
         return csv_file
 
@@ -347,5 +1082,25 @@ def main():
         return None
 
 
+def add_arguments(parser):
+    """Add the fetcher's command-line options to an argparse parser."""
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Resume an interrupted run from its checkpoint')
+    parser.add_argument(
+        '--fields',
+        default=os.getenv('FIELDS'),
+        help=f"Comma-separated columns to export (default: all of {','.join(PR_FIELDS)})")
+
+
+def parse_field_list(spec: str) -> List[str]:
+    """Split a comma-separated --fields value into field names."""
+    return [field.strip() for field in (spec or '').split(',') if field.strip()]
+
+
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description='Fetch GitHub PRs to CSV')
+    add_arguments(parser)
+    args = parser.parse_args()
+    main(resume=args.resume, fields=parse_field_list(args.fields))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+GitHub HTTP Cache
+Disk-backed ETag / Last-Modified cache for GitHub GET requests. Cached
+requests are sent as conditional requests; a 304 Not Modified answer (which
+GitHub does not count against the rate limit) is replayed from disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+
+# Headers not replayed from the cache: hop-by-hop ones, and the length and
+# encoding of the raw body, since the decoded body is stored
+UNCACHED_HEADERS = frozenset({
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'content-length',
+    'content-encoding'
+})
+
+# Bumped when stored entries can no longer be replayed as they are
+CACHE_VERSION = 1
+
+
+def cacheable_headers(headers) -> Dict[str, str]:
+    """The end-to-end headers of a response, e.g. Link for pagination."""
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() not in UNCACHED_HEADERS
+    }
+
+
+class HTTPCache:
+
+    def __init__(self,
+                 path: str = 'output/.cache/github_http.sqlite',
+                 max_bytes: int = 200 * 1024 * 1024):
+        """
+        Open (or create) the cache at the given path. Once the stored
+        bodies exceed max_bytes, least recently used entries are evicted.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_by_access
+                ON responses (last_access);
+        ''')
+        # Entries from before CACHE_VERSION 1 kept only Content-Type, so
+        # replayed pages lost the Link header PyGithub paginates with
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < CACHE_VERSION:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.execute(f'PRAGMA user_version = {CACHE_VERSION}')
+        self._conn.commit()
+
+    @staticmethod
+    def request_key(request: requests.PreparedRequest) -> str:
+        """
+        Key a request by URL plus the headers that change the response, so
+        different tokens or media types never share an entry.
+        """
+        parts = [
+            request.url,
+            request.headers.get('Authorization', ''),
+            request.headers.get('Accept', '')
+        ]
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Return the (etag, last_modified) validators stored for key."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT etag, last_modified FROM responses WHERE key = ?',
+                (key, )).fetchone()
+
+    def load(self, key: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """Return the cached (headers, body) for key and mark it as used."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT headers, body FROM responses WHERE key = ?',
+                (key, )).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                'UPDATE responses SET last_access = ? WHERE key = ?',
+                (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def store(self, key: str, etag: Optional[str],
+              last_modified: Optional[str], headers: Dict[str, str],
+              body: bytes):
+        """Store a response and evict old entries past the size bound."""
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, etag, last_modified, headers, body, size, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, etag, last_modified, json.dumps(headers), body,
+                 len(body), time.time()))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes."""
+        total = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM responses ORDER BY last_access'
+        ).fetchall():
+            self._conn.execute('DELETE FROM responses WHERE key = ?',
+                               (key, ))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+class CachingHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter that turns cached GETs into conditional requests."""
+
+    def __init__(self, *, cache: HTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs):
+        if request.method != 'GET' or kwargs.get('stream'):
+            return super().send(request, **kwargs)
+
+        key = self.cache.request_key(request)
+        validators = self.cache.get(key)
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and validators:
+            cached = self.cache.load(key)
+            if cached:
+                headers, body = cached
+                # Keep the fresh rate-limit headers from the 304 itself
+                headers.update(cacheable_headers(response.headers))
+                response.status_code = 200
+                response.reason = 'OK'
+                response.headers = requests.structures.CaseInsensitiveDict(
+                    headers)
+                response._content = body
+                response.encoding = 'utf-8'
+                self.cache.hits += 1
+                return response
+
+        self.cache.misses += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self.cache.store(key, etag, last_modified,
+                             cacheable_headers(response.headers),
+                             response.content)
+
+        return response
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+Persistent, content-addressed cache of chat completion results, keyed by
+a hash of everything that determines the response.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class LLMCache:
+
+    def __init__(self,
+                 path: str = 'output/.cache/llm_responses.sqlite',
+                 max_entries: int = 100000,
+                 max_age_days: float = 90):
+        """
+        Open (or create) the cache at the given path. Entries older than
+        max_age_days are ignored and pruned; beyond max_entries the least
+        recently used entries are evicted.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS completions_by_access
+                ON completions (last_access);
+        ''')
+        self._prune_expired()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, max_tokens: int,
+                 temperature: float) -> str:
+        """Hash every request parameter that affects the completion."""
+        payload = json.dumps([model, system_prompt, prompt, max_tokens,
+                              temperature])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, counting the hit or miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response FROM completions '
+                'WHERE key = ? AND created_at >= ?',
+                (key, now - self.max_age_seconds)).fetchone()
+            if row:
+                self.hits += 1
+                self._conn.execute(
+                    'UPDATE completions SET last_access = ? WHERE key = ?',
+                    (now, key))
+                self._conn.commit()
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str):
+        """Store a successful response and evict past max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO completions '
+                '(key, response, created_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, response, now, now))
+            self._conn.execute(
+                'DELETE FROM completions WHERE key IN ('
+                'SELECT key FROM completions ORDER BY last_access DESC '
+                'LIMIT -1 OFFSET ?)', (self.max_entries, ))
+            self._conn.commit()
+
+    def _prune_expired(self):
+        """Delete entries older than the maximum age."""
+        with self._lock:
+            self._conn.execute('DELETE FROM completions WHERE created_at < ?',
+                               (time.time() - self.max_age_seconds, ))
+            self._conn.commit()
+
+    def stats(self) -> str:
+        """Human-readable hit/miss summary."""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+Process-wide instrumentation shared by the fetcher and the summarizer:
+per-stage timings, per-endpoint request latency histograms, retry counts,
+OpenAI token usage and assorted counters, written out as a JSON file next
+to the run's outputs.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict
+
+# Upper bounds (milliseconds) of the latency histogram buckets; slower
+# requests land in the final '+Inf' bucket
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Metrics:
+
+    def __init__(self):
+        """Create an empty, thread-safe metrics registry."""
+        self.started = time.time()
+        self.stages = {}
+        self.endpoints = {}
+        self.retries = {}
+        self.tokens = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of work under a named stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started)
+
+    def record_stage(self, name: str, seconds: float):
+        """
+        Add one run of a stage. Concurrent runs add up, so a stage's
+        seconds measure work done rather than wall-clock time.
+        """
+        with self._lock:
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            stage['calls'] += 1
+            stage['seconds'] += seconds
+
+    def record_request(self,
+                       endpoint: str,
+                       seconds: float,
+                       error: bool = False):
+        """Record one request's latency for an endpoint class."""
+        elapsed_ms = seconds * 1000
+        bucket = next((index
+                       for index, bound in enumerate(LATENCY_BUCKETS_MS)
+                       if elapsed_ms <= bound), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            stats = self.endpoints.setdefault(
+                endpoint, {
+                    'requests': 0,
+                    'errors': 0,
+                    'seconds': 0.0,
+                    'max_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                })
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['seconds'] += seconds
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['buckets'][bucket] += 1
+
+    def record_retry(self, endpoint: str):
+        """Count one retried request for an endpoint class."""
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_tokens(self, model: str, prompt_tokens: int,
+                      completion_tokens: int):
+        """Add the token usage reported for one completion."""
+        with self._lock:
+            usage = self.tokens.setdefault(model, {
+                'requests': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0
+            })
+            usage['requests'] += 1
+            usage['prompt_tokens'] += prompt_tokens or 0
+            usage['completion_tokens'] += completion_tokens or 0
+
+    def increment(self, name: str, amount: int = 1):
+        """Add to a named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict:
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self.endpoints.items():
+                labels = [str(bound) for bound in LATENCY_BUCKETS_MS] + ['+Inf']
+                endpoints[endpoint] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'mean_ms': round(stats['seconds'] * 1000 / stats['requests'], 1),
+                    'max_ms': round(stats['max_ms'], 1),
+                    'histogram_ms': dict(zip(labels, stats['buckets']))
+                }
+
+            prompt_tokens = sum(usage['prompt_tokens']
+                                for usage in self.tokens.values())
+            completion_tokens = sum(usage['completion_tokens']
+                                    for usage in self.tokens.values())
+            return {
+                'generated_at': datetime.now(timezone.utc).isoformat(),
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'stages': {
+                    name: {
+                        'calls': stage['calls'],
+                        'seconds': round(stage['seconds'], 3)
+                    }
+                    for name, stage in self.stages.items()
+                },
+                'endpoints': endpoints,
+                'retries': dict(self.retries),
+                'tokens': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens,
+                    'by_model': {
+                        model: dict(usage)
+                        for model, usage in self.tokens.items()
+                    }
+                },
+                'counters': dict(self.counters)
+            }
+
+    def write(self, path: str) -> str:
+        """Write the current snapshot to a JSON file and return its path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        print(f"📈 Saved run metrics to {path}")
+        return path
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry, created on first use."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Columnar PR Datasets
+Optional Parquet or Feather (Arrow IPC) copies of the detailed and
+summarized exports, written next to the CSVs when COLUMNAR_FORMAT is set.
+A dataset is a directory partitioned by repo and creation month
+(repo=<owner/name>/month=YYYY-MM/), with state, project and author stored
+as dictionary-encoded columns. Readers load only the columns they ask for,
+so a report never touches the descriptions. Requires pyarrow.
+"""
+
+import os
+import re
+import shutil
+from typing import Dict, Iterable, List, Mapping
+
+from pr_parser import project_key
+from pr_records import (INT_FIELDS, RECORD_FIELDS, PRRecord,
+                        records_from_columns)
+
+COLUMNAR_FORMATS = ('parquet', 'feather')
+
+PR_URL_REPO = re.compile(r'/([^/]+/[^/]+)/pull/\d+')
+
+PARTITION_COLUMNS = ['repo', 'month']
+DICTIONARY_COLUMNS = ('state', 'project', 'author')
+
+# Original export order, so datasets read back in the same order as the CSV
+POSITION_COLUMN = 'position'
+
+# Schema metadata key listing the columns write_dataset added (e.g. repo
+# for partitioning) rather than took from the records
+DERIVED_KEY = b'derived_columns'
+
+# Columns the markdown report reads from a summarized dataset
+REPORT_COLUMNS = [
+    'pr_url', 'title', 'lines_of_code_changes', 'additions', 'deletions',
+    'state', 'merged', 'repo', 'author', 'cluster_id', 'ai_summary'
+]
+
+
+def dataset_path(csv_file: str, fmt: str) -> str:
+    """Dataset directory for a CSV export, e.g. pr_..._detailed.parquet."""
+    return f"{os.path.splitext(csv_file)[0]}.{fmt}"
+
+
+def is_dataset(path: str) -> bool:
+    """Whether path names a columnar dataset rather than a CSV."""
+    return os.path.splitext(path)[1].lstrip('.') in COLUMNAR_FORMATS
+
+
+def repo_from_url(pr_url: str) -> str:
+    """'owner/name' from a https://github.com/owner/name/pull/N URL."""
+    match = PR_URL_REPO.search(pr_url or '')
+    return match.group(1) if match else None
+
+
+def _arrow():
+    """Import pyarrow, with an install hint if it is missing."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        return pyarrow, pyarrow.dataset
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for columnar output. Run: pip install pyarrow"
+        ) from None
+
+
+def _file_format(dataset, fmt: str):
+    """pyarrow file format for fmt; zstd keeps long descriptions small."""
+    if fmt == 'parquet':
+        file_format = dataset.ParquetFileFormat()
+    elif fmt == 'feather':
+        file_format = dataset.IpcFileFormat()
+    else:
+        raise ValueError(
+            f"Unknown columnar format '{fmt}', expected one of {', '.join(COLUMNAR_FORMATS)}"
+        )
+    return file_format, file_format.make_write_options(compression='zstd')
+
+
+def write_dataset(records: Iterable[Mapping],
+                  path: str,
+                  fmt: str = 'parquet',
+                  defaults: Dict[str, str] = None) -> str:
+    """
+    Write records to a partitioned dataset directory, replacing any
+    previous one. defaults fill columns the records don't carry, such as
+    author in a single-repo export; a missing repo is taken from the PR
+    URL. A project column is derived from titles. Added columns are
+    recorded in the schema metadata, so readers can leave them out.
+    """
+    pa, dataset = _arrow()
+    file_format, write_options = _file_format(dataset, fmt)
+    records = list(records)
+    if not records:
+        return None
+    defaults = {'repo': 'unknown', **(defaults or {})}
+
+    names = [name for name in RECORD_FIELDS if name in records[0]]
+    names += [name for name in ('repo', 'author')
+              if name not in names and name in defaults]
+    if 'title' in names and 'project' not in names:
+        names.append('project')
+
+    columns = {}
+    for name in names:
+        if name == 'project' and name not in records[0]:
+            values = [project_key(record.get('title', ''))
+                      for record in records]
+        elif name == 'repo' and name not in records[0]:
+            values = [
+                repo_from_url(record.get('pr_url', '')) or defaults['repo']
+                for record in records
+            ]
+        else:
+            values = [record.get(name, defaults.get(name))
+                      for record in records]
+        array = pa.array(values, type=pa.int64() if name in INT_FIELDS else None)
+        if name in DICTIONARY_COLUMNS:
+            array = array.dictionary_encode()
+        columns[name] = array
+    columns['month'] = pa.array([
+        str(record.get('created_at') or '')[:7] or 'unknown'
+        for record in records
+    ])
+    columns[POSITION_COLUMN] = pa.array(range(len(records)), pa.int64())
+    derived = [name for name in names if name not in records[0]]
+    table = pa.table(columns).replace_schema_metadata(
+        {DERIVED_KEY: ','.join(derived).encode()})
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    dataset.write_dataset(table,
+                          path,
+                          format=file_format,
+                          file_options=write_options,
+                          partitioning=PARTITION_COLUMNS,
+                          partitioning_flavor='hive')
+    return path
+
+
+def read_dataset(path: str,
+                 columns: List[str] = None,
+                 derived: bool = False) -> List[PRRecord]:
+    """
+    Read a dataset written by write_dataset back into PR records, in
+    export order. Only the given columns (all by default) are loaded.
+    Columns write_dataset added are left out unless derived is set, so
+    the records match those read from the CSV export.
+    """
+    pa, dataset = _arrow()
+    fmt = os.path.splitext(path)[1].lstrip('.')
+    source = dataset.dataset(path,
+                             format=_file_format(dataset, fmt)[0],
+                             partitioning='hive')
+    skipped = {'month', POSITION_COLUMN}
+    if not derived:
+        added = (source.schema.metadata or {}).get(DERIVED_KEY, b'')
+        skipped.update(filter(None, added.decode().split(',')))
+    available = [name for name in source.schema.names if name not in skipped]
+    wanted = [name for name in (columns or available) if name in available]
+
+    table = source.to_table(columns=wanted + [POSITION_COLUMN])
+    table = table.sort_by(POSITION_COLUMN)
+    return records_from_columns(
+        {name: _column_values(pa, table.column(name))
+         for name in wanted})
+
+
+def _column_values(pa, column) -> List:
+    """
+    Python values of a column. Dictionary columns are decoded through
+    their (small) dictionaries, which is far faster than to_pylist and
+    leaves rows sharing one string per distinct value.
+    """
+    if not pa.types.is_dictionary(column.type):
+        return column.to_pylist()
+    values = []
+    for chunk in column.chunks:
+        dictionary = chunk.dictionary.to_pylist()
+        values.extend(None if index is None else dictionary[index]
+                      for index in chunk.indices.to_pylist())
+    return values
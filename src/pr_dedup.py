@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate PR Detection
+Clusters PRs whose titles and descriptions are nearly identical, such as
+backports, cherry-picks and split stacked PRs, so each cluster is
+summarized once. Texts are fingerprinted with one-permutation MinHash
+(a single hash pass per PR) and candidates are found with
+locality-sensitive hashing, keeping clustering roughly linear in the
+number of PRs. A candidate only joins a cluster once its exact shingle
+Jaccard similarity to the representative reaches the threshold, since a
+64-bin estimate is too noisy on short texts to decide alone.
+"""
+
+import re
+import zlib
+from collections import Counter
+from typing import Dict, FrozenSet, List, Tuple
+
+# MinHash signature length and LSH banding (NUM_BINS = BANDS * rows); 16
+# bands of 4 rows surface pairs from roughly 50% Jaccard similarity, and
+# candidates are then verified against the configured threshold
+NUM_BINS = 64
+BANDS = 16
+SHINGLE_WORDS = 3
+EMPTY_BIN = 1 << 32
+
+# Candidates sharing the most bands are verified first; checking only this
+# many keeps templated PR sets from degrading into pairwise comparisons
+MAX_CANDIDATES = 8
+
+# Release and tracking noise that differs between copies of the same change
+NOISE_PATTERNS = [
+    re.compile(r'\(cherry[ -]picked from commit [0-9a-f]+\)'),
+    re.compile(r'^\s*(?:\[[^\]]*\]\s*)+'),
+    re.compile(r'\b(?:backport(?:ed)?|cherry[ -]pick(?:ed)?)\b(?: of)?(?: to)?'),
+    re.compile(r'\b(?:release|branch|v)[-/ ]?\d+(?:\.\d+)*(?:\.x)?\b'),
+    re.compile(r'#\d+'),
+    re.compile(r'\b[0-9a-f]{7,40}\b'),
+    re.compile(r'no meaningful description available'),
+]
+
+
+def fingerprint_text(pr: Dict) -> str:
+    """Normalized title and description used to compare PRs."""
+    text = f"{pr.get('title', '')}\n{pr.get('description', '')}".lower()
+    for pattern in NOISE_PATTERNS:
+        text = pattern.sub(' ', text)
+    return ' '.join(re.findall(r'\w+', text))
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, threshold: float = 0.8):
+        """
+        Create an empty index. PRs whose Jaccard similarity to a cluster's
+        representative reaches threshold join that cluster.
+        """
+        self.threshold = threshold
+        self.rows = NUM_BINS // BANDS
+        self._buckets = {}
+        # Shingle hashes of each cluster's representative, for verification
+        self._representatives = []
+        self.sizes = []
+
+    @staticmethod
+    def shingles(text: str) -> FrozenSet[int]:
+        """Hashes of the text's SHINGLE_WORDS-word shingles."""
+        words = text.split()
+        return frozenset(
+            zlib.crc32(' '.join(words[index:index + SHINGLE_WORDS]).encode())
+            for index in range(max(1, len(words) - SHINGLE_WORDS + 1)))
+
+    def signature(self, shingles: FrozenSet[int]) -> Tuple[int, ...]:
+        """
+        One-permutation MinHash signature of a shingle set: each shingle
+        hash lands in one of NUM_BINS bins, which keep their minimum.
+        Empty bins borrow from the next non-empty one.
+        """
+        bins = [EMPTY_BIN] * NUM_BINS
+        for value in shingles:
+            slot = value % NUM_BINS
+            if value < bins[slot]:
+                bins[slot] = value
+
+        # Walk backwards twice around the ring so every empty bin sees the
+        # nearest filled bin after it; the offset keeps borrowed values
+        # distinct from real ones
+        signature = list(bins)
+        donor, distance = None, 0
+        for offset in range(2 * NUM_BINS - 1, -1, -1):
+            slot = offset % NUM_BINS
+            if bins[slot] != EMPTY_BIN:
+                donor, distance = bins[slot], 0
+            elif donor is not None:
+                distance += 1
+                if offset < NUM_BINS:
+                    signature[slot] = donor + distance * EMPTY_BIN
+        return tuple(signature)
+
+    @staticmethod
+    def similarity(first: FrozenSet[int], second: FrozenSet[int]) -> float:
+        """Exact Jaccard similarity of two shingle sets."""
+        if not (first or second):
+            return 1.0
+        shared = len(first & second)
+        return shared / (len(first) + len(second) - shared)
+
+    def add(self, pr: Dict) -> Tuple[int, bool]:
+        """
+        Assign a PR to the most similar existing cluster, or start a new
+        one. Returns (cluster_id, is_new); cluster ids count up from 0 in
+        the order clusters are created.
+        """
+        shingles = self.shingles(fingerprint_text(pr))
+        signature = self.signature(shingles)
+        bands = [(band, signature[band * self.rows:(band + 1) * self.rows])
+                 for band in range(BANDS)]
+
+        candidates = Counter(
+            cluster_id for band in bands
+            for cluster_id in self._buckets.get(band, ()))
+        best, best_similarity = None, self.threshold
+        for cluster_id, _ in candidates.most_common(MAX_CANDIDATES):
+            similarity = self.similarity(shingles,
+                                         self._representatives[cluster_id])
+            if similarity >= best_similarity:
+                best, best_similarity = cluster_id, similarity
+        if best is not None:
+            self.sizes[best] += 1
+            return best, False
+
+        # Only representatives are indexed, so members stay close to the
+        # PR whose summary they share
+        cluster_id = len(self._representatives)
+        self._representatives.append(shingles)
+        self.sizes.append(1)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(cluster_id)
+        return cluster_id, True
+
+
+def cluster_prs(prs: List[Dict], threshold: float = 0.8) -> List[int]:
+    """
+    Return a cluster id for each PR, in input order. The first PR of each
+    cluster is its representative.
+    """
+    index = NearDuplicateIndex(threshold)
+    return [index.add(pr)[0] for pr in prs]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+PR Text Parser
+Single-pass parsing of PR bodies and titles, shared by the fetcher and the
+summarizer: the Description and Test Plan sections, attachment URLs and
+the project key. Patterns are compiled once; a body is scanned by one
+regex for section markers and one for links instead of line by line, and
+project keys are memoized per title. parse_bodies and project_keys apply
+the parser to a whole column.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple
+
+NO_DESCRIPTION = "No meaningful description available"
+
+# Section contents that mean the author didn't fill the section in
+PLACEHOLDERS = frozenset({'todo', 'tbd', 'n/a', ''})
+
+# Lines that open a kept section or end parsing: '## Description' and
+# '## Test Plan' exactly, any '##' heading mentioning a checklist, or an
+# HTML comment (PR template boilerplate follows both). Matches start at
+# the preceding newline rather than '^' so the regex engine can skip
+# straight to line breaks; bodies are searched with a newline prepended
+SECTION_MARKER = re.compile(
+    r'\n[^\S\n]*(?:(?P<description>## Description)|(?P<test_plan>## Test Plan)'
+    r'|(?P<stop>##[^\n]*(?i:checklist)[^\n]*|<!--[^\n]*))[^\S\n]*(?=\n|\Z)')
+
+# Markdown links; an image ![alt](url) contains the link [alt](url), so
+# one literal-prefixed pattern finds both
+MARKDOWN_LINK = re.compile(r'\[.*?\]\((https?://[^\s\)]+)\)')
+
+# Title format: [TICKET-123] Project Key: summary
+PROJECT_TITLE = re.compile(r'\[([^\]]+)\]\s*([^:]+):')
+# Fallback: the first word run followed by a colon after the ticket
+PROJECT_FALLBACK = re.compile(r'\][^:]*?([A-Za-z][A-Za-z\s]+?):')
+
+UNCATEGORIZED = "Uncategorized"
+
+
+class ParsedPR(NamedTuple):
+    """Parsed PR text; description and test_plan are raw section text."""
+    description: str
+    test_plan: str
+    attachments: List[str]
+    project: str
+
+    def important_description(self) -> str:
+        """
+        The exported description: the non-placeholder Description and
+        Test Plan sections, labelled, or NO_DESCRIPTION.
+        """
+        parts = []
+        if self.description.lower() not in PLACEHOLDERS:
+            parts.append(f"Description: {self.description}")
+        if self.test_plan.lower() not in PLACEHOLDERS:
+            parts.append(f"Test Plan: {self.test_plan}")
+        return '\n\n'.join(parts) if parts else NO_DESCRIPTION
+
+
+def parse_sections(body: str) -> Dict[str, str]:
+    """
+    Return the stripped 'description' and 'test_plan' section texts of a
+    body. Text before the first section is ignored, and parsing stops at
+    the first checklist heading or HTML comment.
+    """
+    text = '\n' + body
+    sections = {'description': [], 'test_plan': []}
+    current = None
+    start = 0
+    for marker in SECTION_MARKER.finditer(text):
+        # Content runs from the line after the previous marker up to the
+        # newline that starts this one
+        if current and start <= marker.start():
+            sections[current].append(text[start:marker.start()])
+        if marker.group('stop') is not None:
+            current = None
+            break
+        current = marker.lastgroup
+        start = marker.end() + 1
+    if current and start <= len(text):
+        sections[current].append(text[start:])
+    return {
+        name: '\n'.join(pieces).strip()
+        for name, pieces in sections.items()
+    }
+
+
+def parse_attachments(body: str) -> List[str]:
+    """Unique image and link URLs in a body, in order of appearance."""
+    return list(dict.fromkeys(MARKDOWN_LINK.findall(body))) if body else []
+
+
+@lru_cache(maxsize=65536)
+def project_key(title: str) -> str:
+    """Project key from a '[TICKET-123] Project: summary' title."""
+    title = str(title)
+    match = PROJECT_TITLE.match(title)
+    if match:
+        return match.group(2).strip()
+    fallback = PROJECT_FALLBACK.search(title)
+    if fallback:
+        return fallback.group(1).strip()
+    return UNCATEGORIZED
+
+
+def parse_pr(title: str, body: str) -> ParsedPR:
+    """Parse a PR's title and body in one pass over each."""
+    body = body or ''
+    sections = parse_sections(body) if body else {
+        'description': '',
+        'test_plan': ''
+    }
+    return ParsedPR(sections['description'], sections['test_plan'],
+                    parse_attachments(body), project_key(title or ''))
+
+
+def parse_bodies(titles: Iterable[str],
+                 bodies: Iterable[str]) -> List[ParsedPR]:
+    """Parse a column of titles alongside a column of bodies."""
+    return [parse_pr(title, body) for title, body in zip(titles, bodies)]
+
+
+def project_keys(titles: Iterable[str]) -> List[str]:
+    """
+    Project keys for a column of titles; each distinct title is parsed
+    once.
+    """
+    titles = list(titles)
+    keys = {title: project_key(title) for title in set(titles)}
+    return [keys[title] for title in titles]
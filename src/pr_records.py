@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PR Records
+Compact PR records and streaming CSV reading and writing, shared by the
+fetcher and the summarizer. A record keeps its fields in __slots__ rather
+than a per-row dict, repeated values (state, repo, author, project) are
+interned, and CSVs are read and written one row at a time, so a large
+export is held in memory exactly once.
+"""
+
+import csv
+import sys
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+# Known columns in CSV order: the exported PR fields, the fan-out columns
+# and the columns added by the summarizer
+RECORD_FIELDS = (
+    'pr_url', 'title', 'description', 'lines_of_code_changes', 'additions',
+    'deletions', 'created_at', 'updated_at', 'state', 'merged', 'attachments',
+    'repo', 'author', 'project', 'cluster_id', 'ai_summary'
+)
+
+_KNOWN_FIELDS = frozenset(RECORD_FIELDS)
+INT_FIELDS = frozenset(
+    {'lines_of_code_changes', 'additions', 'deletions', 'cluster_id'})
+BOOL_FIELDS = frozenset({'merged'})
+
+# Low-cardinality columns; one shared string per distinct value
+INTERNED_FIELDS = frozenset({'state', 'repo', 'author', 'project'})
+
+# Descriptions can exceed the csv module's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+class PRRecord:
+    """
+    One PR with dict-style access (record['title'], record.get(...),
+    'repo' in record), so it can stand in for the dicts the fetcher
+    produces. Unset fields are absent; columns outside RECORD_FIELDS are
+    kept in a small side dict.
+    """
+
+    __slots__ = RECORD_FIELDS + ('_extra',)
+
+    def __init__(self, values: Mapping = None, **fields):
+        self._extra = None
+        for name, value in {**(values or {}), **fields}.items():
+            self[name] = value
+
+    def __getitem__(self, name: str):
+        if name in _KNOWN_FIELDS:
+            try:
+                return getattr(self, name)
+            except AttributeError:
+                raise KeyError(name) from None
+        if self._extra and name in self._extra:
+            return self._extra[name]
+        raise KeyError(name)
+
+    def __setitem__(self, name: str, value):
+        if name in INTERNED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        if name in _KNOWN_FIELDS:
+            setattr(self, name, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, name: str, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        """Set fields, known columns first in CSV order."""
+        keys = [name for name in RECORD_FIELDS if hasattr(self, name)]
+        return keys + list(self._extra or ())
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"PRRecord({self.to_dict()!r})"
+
+
+def records_from_columns(columns: Mapping[str, List]) -> List[PRRecord]:
+    """
+    Build records from column-major data (equal-length lists keyed by
+    column name), filling one column at a time.
+    """
+    size = len(next(iter(columns.values()), ()))
+    records = [PRRecord() for _ in range(size)]
+    for name, values in columns.items():
+        if name in INTERNED_FIELDS:
+            values = [
+                sys.intern(value) if isinstance(value, str) else value
+                for value in values
+            ]
+        if name in _KNOWN_FIELDS:
+            for record, value in zip(records, values):
+                setattr(record, name, value)
+        else:
+            for record, value in zip(records, values):
+                record[name] = value
+    return records
+
+
+def _parse_value(name: str, value: str):
+    """Convert one CSV cell back to the type the fetcher exported."""
+    if name in INT_FIELDS:
+        if value == '':
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return int(float(value))
+    if name in BOOL_FIELDS:
+        return value == 'True' if value in ('True', 'False') else value
+    return value
+
+
+def read_pr_csv(path: str) -> Iterator[PRRecord]:
+    """Yield one PRRecord per row of a PR CSV, reading it as a stream."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        for row in reader:
+            record = PRRecord()
+            for name, value in zip(header, row):
+                record[name] = _parse_value(name, value)
+            yield record
+
+
+def write_pr_csv(path: str,
+                 records: Iterable[Mapping],
+                 columns: List[str] = None,
+                 quoting: int = csv.QUOTE_MINIMAL) -> int:
+    """
+    Write records (PRRecords or dicts) to a CSV one row at a time and
+    return the number written. Columns default to the first record's
+    fields; missing values are written empty.
+    """
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=quoting, lineterminator='\n')
+        for record in records:
+            if columns is None:
+                columns = list(record.keys())
+            if count == 0:
+                writer.writerow(columns)
+            writer.writerow([
+                '' if value is None else value
+                for value in (record.get(name) for name in columns)
+            ])
+            count += 1
+    return count
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+PR Rollup Index
+SQLite-backed aggregates of PR activity bucketed by creation day, repo,
+author and project: PR counts, additions, deletions and merged/closed/open
+counts. Each fetch updates only the buckets its new or changed PRs fall
+in, so dashboards and quarterly reports read a few rows per bucket
+instead of rescanning every exported PR. Date ranges are exact; weekly
+groups are derived from the daily buckets.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+from pr_columnar import repo_from_url
+from pr_parser import project_key
+from pr_store import PRStore
+
+ROLLUP_DIMENSIONS = ('week', 'repo', 'author', 'project')
+
+# SQL for each dimension; weeks are the Monday on or before a bucket's day
+DIMENSION_SQL = {
+    'week': "date(day, '-6 days', 'weekday 1')",
+    'repo': 'repo',
+    'author': 'author',
+    'project': 'project'
+}
+ROLLUP_METRICS = ('prs', 'additions', 'deletions', 'merged', 'closed', 'open')
+
+# PR fields a record needs to be indexed
+ROLLUP_FIELDS = ('pr_url', 'title', 'additions', 'deletions', 'created_at',
+                 'state', 'merged')
+
+FILTERS = ('repo', 'author', 'project')
+
+UNKNOWN = 'unknown'
+
+
+def day_of(value: Union[str, date]) -> str:
+    """'YYYY-MM-DD' of a timestamp ('YYYY-MM-DD...'), date or datetime."""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10]).isoformat()
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def week_label(monday: str) -> str:
+    """ISO week label, e.g. '2024-W05', for a week's Monday ('YYYY-MM-DD')."""
+    year, week, _ = date.fromisoformat(monday).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def quarter_range(quarter: str) -> Tuple[date, date]:
+    """First and last day of a quarter such as '2024Q2'."""
+    year, _, number = quarter.upper().partition('Q')
+    if not (year.isdigit() and number in ('1', '2', '3', '4')):
+        raise ValueError(f"Quarter must look like 2024Q2, got '{quarter}'")
+    first = date(int(year), 3 * int(number) - 2, 1)
+    following = (date(first.year + 1, 1, 1) if number == '4' else date(
+        first.year, first.month + 3, 1))
+    return first, following - timedelta(days=1)
+
+
+def pr_outcome(pr: Mapping) -> str:
+    """'merged', 'closed' (without merging) or 'open'."""
+    if pr.get('merged') in (True, 'True'):
+        return 'merged'
+    return 'closed' if pr.get('state') == 'closed' else 'open'
+
+
+class RollupIndex:
+
+    def __init__(self, path: str = 'output/pr_rollups.sqlite'):
+        """Open (or create) the index at the given path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS indexed_pr_days (
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                author TEXT NOT NULL,
+                project TEXT NOT NULL,
+                additions INTEGER NOT NULL,
+                deletions INTEGER NOT NULL,
+                outcome TEXT NOT NULL,
+                PRIMARY KEY (repo, number)
+            );
+            CREATE TABLE IF NOT EXISTS daily_rollups (
+                day TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                author TEXT NOT NULL,
+                project TEXT NOT NULL,
+                prs INTEGER NOT NULL,
+                additions INTEGER NOT NULL,
+                deletions INTEGER NOT NULL,
+                merged INTEGER NOT NULL,
+                closed INTEGER NOT NULL,
+                open INTEGER NOT NULL,
+                PRIMARY KEY (day, repo, author, project)
+            );
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def _entry(pr: Mapping, defaults: Mapping) -> Tuple:
+        """
+        (repo, number, day, author, project, additions, deletions,
+        outcome); author is None if neither the record nor defaults have one.
+        """
+        repo = (pr.get('repo') or repo_from_url(pr['pr_url'])
+                or defaults.get('repo') or UNKNOWN)
+        return (repo, PRStore.pr_number(pr['pr_url']),
+                day_of(pr['created_at']),
+                pr.get('author') or defaults.get('author'),
+                project_key(pr.get('title') or ''),
+                int(pr.get('additions') or 0), int(pr.get('deletions') or 0),
+                pr_outcome(pr))
+
+    def _apply(self, entry: Tuple, sign: int):
+        """Add (sign=1) or remove (sign=-1) one PR's contribution."""
+        repo, _, day, author, project, additions, deletions, outcome = entry
+        self._conn.execute(
+            'INSERT INTO daily_rollups (day, repo, author, project, prs, '
+            'additions, deletions, merged, closed, open) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (day, repo, author, project) DO UPDATE SET '
+            'prs = prs + excluded.prs, '
+            'additions = additions + excluded.additions, '
+            'deletions = deletions + excluded.deletions, '
+            'merged = merged + excluded.merged, '
+            'closed = closed + excluded.closed, '
+            'open = open + excluded.open',
+            (day, repo, author, project, sign, sign * additions,
+             sign * deletions, sign * (outcome == 'merged'),
+             sign * (outcome == 'closed'), sign * (outcome == 'open')))
+
+    def add_prs(self, prs: Iterable[Mapping],
+                defaults: Mapping[str, str] = None) -> int:
+        """
+        Index new PRs and re-bucket changed ones (e.g. merged since the
+        last fetch); unchanged PRs cost one lookup. defaults supply repo
+        and author for records that don't carry them; without either, an
+        already indexed PR keeps its author (single-author exports have
+        no author column). Returns the number of PRs added or updated.
+        """
+        entries = [self._entry(pr, defaults or {}) for pr in prs]
+        changed = 0
+        with self._lock:
+            for entry in entries:
+                previous = self._conn.execute(
+                    'SELECT repo, number, day, author, project, additions, '
+                    'deletions, outcome FROM indexed_pr_days '
+                    'WHERE repo = ? AND number = ?', entry[:2]).fetchone()
+                if entry[3] is None:
+                    author = previous[3] if previous else UNKNOWN
+                    entry = entry[:3] + (author, ) + entry[4:]
+                if previous == entry:
+                    continue
+                if previous:
+                    self._apply(previous, -1)
+                self._apply(entry, 1)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO indexed_pr_days (repo, number, day, '
+                    'author, project, additions, deletions, outcome) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', entry)
+                changed += 1
+            self._conn.execute('DELETE FROM daily_rollups WHERE prs = 0')
+            self._conn.commit()
+        return changed
+
+    def query(self,
+              since: Union[str, date] = None,
+              until: Union[str, date] = None,
+              group_by: Sequence[str] = ('project', ),
+              **filters: str) -> List[Dict]:
+        """
+        Aggregate the buckets of PRs created between since and until
+        (inclusive dates), grouped by any of ROLLUP_DIMENSIONS and
+        optionally filtered by repo, author or project. Only PRs created
+        within the range count, so the first and last weeks of a range that
+        splits them are partial. Rows carry the group values (weeks as
+        '2024-W05'), the ROLLUP_METRICS and lines (additions + deletions).
+        """
+        group_by = list(group_by)
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        unknown += [name for name in filters if name not in FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown rollup field(s): {', '.join(unknown)}")
+
+        conditions, params = [], []
+        if since:
+            conditions.append('day >= ?')
+            params.append(day_of(since))
+        if until:
+            conditions.append('day <= ?')
+            params.append(day_of(until))
+        for name, value in filters.items():
+            if value:
+                conditions.append(f'{name} = ?')
+                params.append(value)
+
+        sums = ', '.join(f'SUM({metric})' for metric in ROLLUP_METRICS)
+        columns = [f'{DIMENSION_SQL[name]} AS {name}' for name in group_by]
+        sql = f"SELECT {', '.join(columns + [sums])} FROM daily_rollups"
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)}"
+            sql += (' ORDER BY week' if 'week' in group_by else
+                    ' ORDER BY SUM(prs) DESC') + f", {', '.join(group_by)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(zip(group_by + list(ROLLUP_METRICS), row))
+            if result['prs'] is None:  # No buckets in range
+                continue
+            if 'week' in result:
+                result['week'] = week_label(result['week'])
+            result['lines'] = result['additions'] + result['deletions']
+            results.append(result)
+        return results
+
+    def totals(self,
+               since: Union[str, date] = None,
+               until: Union[str, date] = None,
+               **filters: str) -> Dict:
+        """Totals over a range, with the same filters as query."""
+        rows = self.query(since, until, (), **filters)
+        return rows[0] if rows else {
+            **{metric: 0 for metric in ROLLUP_METRICS}, 'lines': 0
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+def format_rollups(rows: List[Dict], group_by: Sequence[str]) -> str:
+    """Markdown table of query rows."""
+    headers = [name.title() for name in group_by] + [
+        'PRs', 'Lines', 'Additions', 'Deletions', 'Merged', 'Closed', 'Open'
+    ]
+    lines = [
+        '| ' + ' | '.join(headers) + ' |',
+        '|' + '|'.join('---' for _ in headers) + '|'
+    ]
+    for row in rows:
+        cells = [str(row[name]) for name in group_by] + [
+            f"{row[metric]:,}" for metric in ('prs', 'lines', 'additions',
+                                              'deletions', 'merged', 'closed',
+                                              'open')
+        ]
+        lines.append('| ' + ' | '.join(cells) + ' |')
+    return '\n'.join(lines)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Persistent PR Store
+SQLite-backed store of fetched PR records keyed by repo and PR number,
+used to fetch only PRs updated since the last run.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class PRStore:
+
+    def __init__(self, path: str = 'output/pr_store.sqlite'):
+        """Open (or create) the store at the given path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS prs (
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                author TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (repo, number)
+            );
+            CREATE INDEX IF NOT EXISTS prs_by_author
+                ON prs (repo, author, created_at);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                repo TEXT NOT NULL,
+                author TEXT NOT NULL,
+                synced_at TEXT NOT NULL,
+                window_start TEXT NOT NULL,
+                PRIMARY KEY (repo, author)
+            );
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def pr_number(pr_url: str) -> int:
+        """Extract the PR number from its html URL (.../pull/<number>)."""
+        return int(pr_url.rstrip('/').rsplit('/', 1)[-1])
+
+    def get_sync_state(
+            self, repo: str,
+            author: str) -> Optional[Dict[str, datetime]]:
+        """
+        Return when (repo, author) was last synced and the start of the
+        window covered by that sync, or None if it was never synced.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT synced_at, window_start FROM sync_state '
+                'WHERE repo = ? AND author = ?', (repo, author)).fetchone()
+        if not row:
+            return None
+        return {
+            'synced_at': datetime.fromisoformat(row[0]),
+            'window_start': datetime.fromisoformat(row[1])
+        }
+
+    def set_sync_state(self, repo: str, author: str, synced_at: datetime,
+                       window_start: datetime):
+        """Record a completed sync of (repo, author)."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state '
+                '(repo, author, synced_at, window_start) VALUES (?, ?, ?, ?)',
+                (repo, author, synced_at.isoformat(),
+                 window_start.isoformat()))
+            self._conn.commit()
+
+    def upsert_prs(self, repo: str, author: str, prs: List[Dict]):
+        """Insert new PR records and replace existing ones."""
+        rows = [(repo, self.pr_number(pr['pr_url']), author, pr['created_at'],
+                 pr['updated_at'], json.dumps(pr)) for pr in prs]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO prs '
+                '(repo, number, author, created_at, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._conn.commit()
+
+    def get_prs(self, repo: str, author: str, since: datetime) -> List[Dict]:
+        """Return stored PRs created after `since`, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data FROM prs '
+                'WHERE repo = ? AND author = ? AND created_at > ? '
+                'ORDER BY created_at DESC',
+                (repo, author, since.isoformat())).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
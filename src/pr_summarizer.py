@@ -6,15 +6,50 @@ Uses OpenAI to generate concise summaries of PR descriptions and analyze pattern
 
 import os
 import sys
-import pandas as pd
 import json
 import argparse
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from pr_parser import project_key, project_keys
+from rate_limiter import get_scheduler
 
 # Load environment variables
 load_dotenv()
 
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes GitHub pull requests concisely and accurately."
+TEMPERATURE = 0.3
+SUMMARY_MAX_TOKENS = 150
+
+# Checkpoint key holding the ids of submitted batch jobs not yet merged
+BATCH_CHECKPOINT_KEY = 'batch_jobs'
+
+# Rough token accounting for batched summaries
+CHARS_PER_TOKEN = 4
+SUMMARY_TOKENS_PER_PR = 80
+
+# Placeholder the fetcher exports for PRs without a usable description
+NO_DESCRIPTION = "No meaningful description available"
+
+# Columns summarizing and reporting can't do without; the others (e.g.
+# when fetched with --fields) are left out of prompts and the report
+REQUIRED_FIELDS = ('pr_url', 'title')
+
+# Titles of automated dependency updates (Dependabot, Renovate, ...)
+DEPENDENCY_TITLE = re.compile(
+    r'^(?:\[[^\]]*\]\s*)?(?:(?:chore|build|fix)\(deps(?:-dev)?\)!?:|bump\s|update dependency\s)',
+    re.IGNORECASE)
+
+# Markdown that carries little meaning for a summary
+CODE_BLOCK = re.compile(r'```.*?```', re.DOTALL)
+HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+MARKDOWN_IMAGE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+
 
 class PRSummarizer:
 
@@ -22,7 +57,14 @@ class PRSummarizer:
         """Initialize the summarizer with OpenAI."""
         self.client = None
         self.model = None
+        self.scheduler = get_scheduler()
+        self.metrics = self.scheduler.metrics
+        self.cache = None
         self._setup_openai()
+        self._setup_cache()
+        self._setup_triage()
+        self._setup_dedup()
+        self._setup_batch_jobs()
 
     def _setup_openai(self):
         """Setup OpenAI client."""
@@ -32,36 +74,232 @@ class PRSummarizer:
             if not api_key:
                 raise ValueError(
                     "OPENAI_API_KEY environment variable required")
-            self.client = openai.OpenAI(api_key=api_key)
+            # Retries are handled by the rate-limit scheduler instead
+            self.client = openai.OpenAI(api_key=api_key, max_retries=0)
             self.model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
             print(f"✅ OpenAI client initialized with model: {self.model}")
         except ImportError:
             print("❌ OpenAI library not installed. Run: pip install openai")
             sys.exit(1)
 
-    def _call_openai(self, prompt: str, max_tokens: int = 150) -> str:
+    def _setup_cache(self):
+        """Setup the persistent response cache (LLM_CACHE_MAX_ENTRIES=0 disables)."""
+        max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '100000'))
+        if max_entries <= 0:
+            return
+        from llm_cache import LLMCache
+        self.cache = LLMCache(
+            os.getenv('LLM_CACHE_PATH', 'output/.cache/llm_responses.sqlite'),
+            max_entries=max_entries,
+            max_age_days=float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '90')))
+
+    def _setup_triage(self):
+        """
+        Setup pre-summarization triage. TRIAGE=0 sends every PR to the
+        model; TRIAGE_MAX_LINES is the size up to which a PR counts as
+        trivial; DESCRIPTION_TOKEN_BUDGET caps description length (0
+        disables condensing).
+        """
+        self.triage_enabled = os.getenv('TRIAGE', '1').lower() not in ('0',
+                                                                      'false',
+                                                                      'no')
+        self.triage_max_lines = int(os.getenv('TRIAGE_MAX_LINES', '2'))
+        self.description_token_budget = int(
+            os.getenv('DESCRIPTION_TOKEN_BUDGET', '500'))
+
+    def _setup_dedup(self):
+        """
+        Setup near-duplicate clustering. PRs at least DEDUP_THRESHOLD
+        similar (shingle Jaccard, default 0.8) share one summary; 0
+        disables clustering.
+        """
+        self.dedup_threshold = float(os.getenv('DEDUP_THRESHOLD', '0.8'))
+
+    def _setup_batch_jobs(self):
+        """
+        Setup offline batch jobs: BATCH_POLL_SECONDS between status checks
+        (default 30) and BATCH_MAX_ATTEMPTS jobs per run, the later ones
+        resubmitting only failed requests (default 3).
+        """
+        self.batch_poll_seconds = float(os.getenv('BATCH_POLL_SECONDS', '30'))
+        self.batch_max_attempts = int(os.getenv('BATCH_MAX_ATTEMPTS', '3'))
+
+    def cluster_prs(self, prs: List[Dict]) -> List[int]:
+        """
+        Assign each PR a cluster id; near-duplicates share one. Every PR
+        gets its own cluster when dedup is disabled.
+        """
+        if self.dedup_threshold <= 0:
+            return list(range(len(prs)))
+        from pr_dedup import cluster_prs
+        with self.metrics.stage('dedup'):
+            cluster_ids = cluster_prs(prs, self.dedup_threshold)
+        self._report_dedup(len(prs), len(set(cluster_ids)))
+        return cluster_ids
+
+    def _report_dedup(self, total: int, clusters: int):
+        """Print and count how many PRs reuse another PR's summary."""
+        if clusters < total:
+            self.metrics.increment('near_duplicates', total - clusters)
+            print(
+                f"🧬 Dedup: {total} PRs form {clusters} clusters; {total - clusters} near-duplicates reuse their cluster's summary"
+            )
+
+    def _create_completion(self, **kwargs):
+        """
+        Send one chat completion, report its rate-limit headers and record
+        its latency and token usage.
+        """
+        started = time.perf_counter()
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(
+                **kwargs)
+        except Exception:
+            self.metrics.record_request('chat',
+                                        time.perf_counter() - started,
+                                        error=True)
+            raise
+        self.metrics.record_request('chat', time.perf_counter() - started)
+        self.scheduler.observe('chat', raw.headers)
+        response = raw.parse()
+        if response.usage:
+            self.metrics.record_tokens(kwargs['model'],
+                                       response.usage.prompt_tokens,
+                                       response.usage.completion_tokens)
+        return response
+
+    def _request_body(self, prompt: str, max_tokens: int) -> Dict:
+        """Chat completion parameters for a prompt."""
+        return {
+            'model': self.model,
+            'messages': [{
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            }, {
+                "role": "user",
+                "content": prompt
+            }],
+            'max_tokens': max_tokens,
+            'temperature': TEMPERATURE
+        }
+
+    def _complete(self, prompt: str, max_tokens: int, parse=None):
+        """
+        Return the completion text for a prompt, serving repeated requests
+        from the cache. If parse is given, its result is returned instead
+        and a truncated or unparseable response raises. Raises on API
+        errors; only complete, valid responses are cached.
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model, SYSTEM_PROMPT, prompt,
+                                            max_tokens, TEMPERATURE)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.metrics.increment('llm_cache_hits')
+                return parse(cached) if parse else cached
+
+        response = self.scheduler.call('chat',
+                                       self._create_completion,
+                                       **self._request_body(
+                                           prompt, max_tokens))
+        choice = response.choices[0]
+        content = (choice.message.content or '').strip()
+        truncated = choice.finish_reason == 'length'
+
+        result = content
+        if parse:
+            if truncated:
+                raise ValueError("response was truncated")
+            result = parse(content)
+
+        if cache_key and not truncated:
+            self.cache.put(cache_key, content)
+        return result
+
+    def _call_openai(self,
+                     prompt: str,
+                     max_tokens: int = SUMMARY_MAX_TOKENS) -> str:
         """Call OpenAI API."""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{
-                    "role":
-                    "system",
-                    "content":
-                    "You are a helpful assistant that summarizes GitHub pull requests concisely and accurately."
-                }, {
-                    "role": "user",
-                    "content": prompt
-                }],
-                max_tokens=max_tokens,
-                temperature=0.3)
-            return response.choices[0].message.content.strip()
+            return self._complete(prompt, max_tokens)
         except Exception as e:
+            # Errors are returned as the result but never cached
             return f"Error: {str(e)}"
 
-    def summarize_pr(self, title: str, description: str) -> str:
-        """Generate a concise summary of a single PR."""
-        prompt = f"""Summarize this GitHub pull request in 1-2 concise sentences. Focus on what was changed and why.
+    def triage(self, pr: Dict) -> Optional[str]:
+        """
+        Return a template summary for a PR too trivial to be worth a model
+        call (no description, a dependency update, or a tiny change), or
+        None if it should be summarized by the model.
+        """
+        if not self.triage_enabled:
+            return None
+
+        title = str(pr['title']).strip().rstrip('.')
+        # Without a description column, absence says nothing about the PR
+        description = (str(pr['description']).strip()
+                       if 'description' in pr else None)
+        lines = pr.get('lines_of_code_changes')
+        try:
+            lines = int(lines)
+        except (TypeError, ValueError):
+            lines = None
+        size = f"{lines} lines changed" if lines is not None else None
+
+        if DEPENDENCY_TITLE.match(title):
+            summary = f"Dependency update: {title}."
+        elif description in ('', 'nan', NO_DESCRIPTION):
+            summary = f"{title} ({size + '; ' if size else ''}no description provided)."
+        elif lines is not None and lines <= self.triage_max_lines:
+            summary = f"Small change ({size}): {title}."
+        else:
+            return None
+
+        self.metrics.increment('llm_calls_skipped')
+        return summary
+
+    def condense_description(self, description: str) -> str:
+        """
+        Fit a description into DESCRIPTION_TOKEN_BUDGET: drop code blocks,
+        HTML comments, images and blank lines, then trim at a word boundary.
+        """
+        description = str(description)
+        if not self._over_budget(description):
+            return description
+        budget = self.description_token_budget
+
+        condensed = CODE_BLOCK.sub('[code omitted]', description)
+        condensed = HTML_COMMENT.sub('', condensed)
+        condensed = MARKDOWN_IMAGE.sub('', condensed)
+        condensed = '\n'.join(line.rstrip() for line in condensed.splitlines()
+                              if line.strip())
+
+        max_chars = budget * CHARS_PER_TOKEN
+        if len(condensed) > max_chars:
+            condensed = condensed[:max_chars].rsplit(' ', 1)[0] + ' [...]'
+        return condensed
+
+    def _over_budget(self, description: str) -> bool:
+        """Whether condense_description would shorten a description."""
+        budget = self.description_token_budget
+        return budget > 0 and self.estimate_tokens(description) > budget
+
+    def _count_condensed(self, prs: List[Dict]):
+        """
+        Count the PRs about to be summarized whose descriptions get
+        condensed. Prompts are built more than once per PR (packing, split
+        retries), so condense_description itself doesn't count.
+        """
+        condensed = sum(
+            self._over_budget(str(pr.get('description', ''))) for pr in prs)
+        if condensed:
+            self.metrics.increment('descriptions_condensed', condensed)
+
+    def summary_prompt(self, title: str, description: str) -> str:
+        """Prompt asking for a concise summary of a single PR."""
+        description = self.condense_description(description)
+        return f"""Summarize this GitHub pull request in 1-2 concise sentences. Focus on what was changed and why.
 
 Title: {title}
 
@@ -69,62 +307,487 @@ Description: {description}
 
 Summary:"""
 
-        return self._call_openai(prompt)
+    def summarize_pr(self, title: str, description: str) -> str:
+        """Generate a concise summary of a single PR."""
+        return self._call_openai(self.summary_prompt(title, description),
+                                 SUMMARY_MAX_TOKENS)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Cheap token estimate (~4 characters per token)."""
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    def pack_batches(self, prs: List[Dict],
+                     token_budget: int) -> List[List[Dict]]:
+        """
+        Greedily pack PRs, in order, into batches whose prompt plus expected
+        output fits the token budget. A PR too large for the budget on its
+        own gets a batch to itself.
+        """
+        batches = []
+        current = []
+        used = 0
+        for pr in prs:
+            cost = self.estimate_tokens(
+                f"{pr['pr_url']} {pr['title']} {self.condense_description(pr.get('description', ''))}"
+            ) + SUMMARY_TOKENS_PER_PR
+            if current and used + cost > token_budget:
+                batches.append(current)
+                current = []
+                used = 0
+            current.append(pr)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def summarize_batch(self, prs: List[Dict]) -> Dict[str, str]:
+        """
+        Summarize several PRs in a single request, returning summaries keyed
+        by PR URL. A malformed, incomplete or truncated response is split in
+        half and retried; a single PR falls back to summarize_pr. An API
+        error the scheduler couldn't retry away becomes every PR's
+        "Error: ..." summary, since smaller requests would fail the same way.
+        """
+        if len(prs) == 1:
+            pr = prs[0]
+            return {
+                pr['pr_url']:
+                self.summarize_pr(pr['title'], pr.get('description', ''))
+            }
+
+        entries = json.dumps([{
+            'url': pr['pr_url'],
+            'title': str(pr['title']),
+            'description': self.condense_description(pr.get('description', ''))
+        } for pr in prs],
+                             indent=1)
+        prompt = f"""Summarize each of these GitHub pull requests in 1-2 concise sentences. Focus on what was changed and why.
+
+Respond with only a JSON object mapping each PR's "url" to its summary string, with one entry for every PR.
+
+Pull requests:
+{entries}
+
+JSON:"""
+
+        def parse(content: str) -> Dict[str, str]:
+            # Tolerate prose or code fences around the JSON object
+            start, end = content.find('{'), content.rfind('}')
+            summaries = json.loads(content[start:end + 1])
+            if not isinstance(summaries, dict):
+                raise ValueError("response is not a JSON object")
+            missing = [
+                pr['pr_url'] for pr in prs
+                if not isinstance(summaries.get(pr['pr_url']), str)
+            ]
+            if missing:
+                raise ValueError(f"{len(missing)} PRs missing from response")
+            return {pr['pr_url']: summaries[pr['pr_url']] for pr in prs}
+
+        try:
+            return self._complete(prompt,
+                                  max_tokens=SUMMARY_TOKENS_PER_PR * len(prs) +
+                                  50,
+                                  parse=parse)
+        except ValueError as e:
+            # Unparseable, incomplete or truncated (json errors included)
+            print(f"⚠️  Batch of {len(prs)} PRs failed ({e}), splitting...")
+            middle = len(prs) // 2
+            result = self.summarize_batch(prs[:middle])
+            result.update(self.summarize_batch(prs[middle:]))
+            return result
+        except Exception as e:
+            print(f"❌ Batch of {len(prs)} PRs failed: {e}")
+            return {pr['pr_url']: f"Error: {str(e)}" for pr in prs}
+
+    def summarize_prs(self,
+                      prs: List[Dict],
+                      concurrency: int = 8,
+                      batch_tokens: int = 0,
+                      checkpoint=None) -> List[str]:
+        """
+        Summarize many PRs with up to `concurrency` requests in flight.
+        Summaries are returned in input order; a failure on one PR becomes
+        that PR's "Error: ..." summary without affecting the others.
+        With batch_tokens > 0, PRs are packed into multi-PR requests of
+        roughly that many tokens each. With a Checkpoint, PRs summarized by
+        an earlier run are skipped and new summaries are appended to it.
+        """
+        skipped_before = self.metrics.counters.get('llm_calls_skipped', 0)
+
+        if batch_tokens > 0:
+            pending = [
+                pr for pr in prs
+                if not (checkpoint and checkpoint.get(pr['pr_url']))
+            ]
+            # Trivial PRs get template summaries instead of a batch slot
+            templated = {}
+            for pr in pending:
+                summary = self.triage(pr)
+                if summary:
+                    templated[pr['pr_url']] = summary
+            pending = [pr for pr in pending if pr['pr_url'] not in templated]
+            self._report_triage(skipped_before, len(prs))
+            self._count_condensed(pending)
+
+            batches = self.pack_batches(pending, batch_tokens)
+            print(f"📦 Packed {len(pending)} PRs into {len(batches)} requests")
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                by_url = dict(templated)
+                for done, result in enumerate(
+                        pool.map(self.summarize_batch, batches), start=1):
+                    by_url.update(result)
+                    if checkpoint:
+                        for url, summary in result.items():
+                            self._checkpoint_summary(checkpoint, url, summary)
+                    print(f"Processed batch {done}/{len(batches)}...")
+            return [
+                by_url[pr['pr_url']] if pr['pr_url'] in by_url else
+                checkpoint.get(pr['pr_url'])['ai_summary'] for pr in prs
+            ]
+
+        summaries = []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for idx, summary in enumerate(
+                    pool.map(
+                        lambda pr: self._summarize_checkpointed(
+                            pr, checkpoint), prs)):
+                summaries.append(summary)
+                print(
+                    f"Processed PR {idx + 1}/{len(prs)}: {str(prs[idx]['title'])[:50]}..."
+                )
+        self._report_triage(skipped_before, len(prs))
+        return summaries
+
+    def summarize_batch_job(self,
+                            prs: List[Dict],
+                            checkpoint=None,
+                            job_name: str = 'summaries') -> List[str]:
+        """
+        Summarize PRs offline through the Batch API. The summarize_pr
+        prompts of PRs not already checkpointed, triaged or cached are
+        written to output/batches/<job_name>_attempt<N>.jsonl, submitted,
+        polled until done and merged back by PR URL. Failed requests are
+        resubmitted on their own, up to BATCH_MAX_ATTEMPTS jobs; any still
+        failing get "Error: ..." summaries. Submitted job ids are
+        checkpointed, so a resumed run waits for them instead of
+        submitting again.
+        """
+        from batch_jobs import (MAX_REQUESTS_PER_BATCH, BatchRunner,
+                                write_job_file)
+
+        skipped_before = self.metrics.counters.get('llm_calls_skipped', 0)
+        by_url = {}
+        prompts = {}
+        for pr in prs:
+            url = pr['pr_url']
+            done = checkpoint.get(url) if checkpoint else None
+            if done:
+                by_url[url] = done['ai_summary']
+                continue
+            summary = self.triage(pr)
+            if not summary:
+                self._count_condensed([pr])
+                prompt = self.summary_prompt(pr['title'],
+                                             pr.get('description', ''))
+                summary = self.cache.get(
+                    self.cache.make_key(self.model, SYSTEM_PROMPT, prompt,
+                                        SUMMARY_MAX_TOKENS,
+                                        TEMPERATURE)) if self.cache else None
+                if summary is None:
+                    prompts[url] = prompt
+                    continue
+                self.metrics.increment('llm_cache_hits')
+            by_url[url] = summary
+            if checkpoint:
+                self._checkpoint_summary(checkpoint, url, summary)
+        self._report_triage(skipped_before, len(prs))
+
+        runner = BatchRunner(self.client, self.scheduler,
+                             self.batch_poll_seconds)
+        submitted = checkpoint.get(BATCH_CHECKPOINT_KEY) if checkpoint else None
+        batch_ids = submitted['batch_ids'] if submitted else []
+        errors = {}
+        for attempt in range(1, self.batch_max_attempts + 1):
+            if not prompts:
+                break
+            if not batch_ids:
+                urls = list(prompts)
+                for start in range(0, len(urls), MAX_REQUESTS_PER_BATCH):
+                    part = urls[start:start + MAX_REQUESTS_PER_BATCH]
+                    path = f"output/batches/{job_name}_attempt{attempt}_{start // MAX_REQUESTS_PER_BATCH + 1}.jsonl"
+                    write_job_file(path, ((url, self._request_body(
+                        prompts[url], SUMMARY_MAX_TOKENS)) for url in part))
+                    batch_ids.append(
+                        runner.submit(path, {'job': job_name}))
+                self.metrics.increment('batch_requests', len(urls))
+                if checkpoint:
+                    checkpoint.append(BATCH_CHECKPOINT_KEY,
+                                      {'batch_ids': batch_ids})
+
+            for batch_id in batch_ids:
+                bodies, batch_errors = runner.results(runner.wait(batch_id))
+                errors.update(batch_errors)
+                for url, body in bodies.items():
+                    if url not in prompts:
+                        continue
+                    summary = self._batch_summary(prompts[url], body)
+                    if summary is None:
+                        errors[url] = "response was empty or truncated"
+                        continue
+                    by_url[url] = summary
+                    del prompts[url]
+                    if checkpoint:
+                        self._checkpoint_summary(checkpoint, url, summary)
+            batch_ids = []
+            if checkpoint:
+                checkpoint.append(BATCH_CHECKPOINT_KEY, {'batch_ids': []})
+            if prompts and attempt < self.batch_max_attempts:
+                print(
+                    f"🔁 {len(prompts)} batch requests failed; resubmitting only those"
+                )
+
+        for url in prompts:
+            by_url[url] = f"Error: {errors.get(url, 'no batch result')}"
+        if prompts:
+            print(f"⚠️  {len(prompts)} PRs could not be summarized by batch jobs")
+        return [by_url[pr['pr_url']] for pr in prs]
+
+    def _batch_summary(self, prompt: str, body: Dict) -> Optional[str]:
+        """
+        Summary text from a batch response body, recording its token usage
+        and caching it; None if it is empty or was truncated.
+        """
+        usage = body.get('usage')
+        if usage:
+            # Kept apart from synchronous usage, which is billed at twice
+            # the batch rate
+            self.metrics.record_tokens(
+                f"{body.get('model', self.model)} (batch)",
+                usage['prompt_tokens'], usage['completion_tokens'])
+        choice = (body.get('choices') or [{}])[0]
+        content = ((choice.get('message') or {}).get('content') or '').strip()
+        if not content or choice.get('finish_reason') == 'length':
+            return None
+        if self.cache:
+            self.cache.put(
+                self.cache.make_key(self.model, SYSTEM_PROMPT, prompt,
+                                    SUMMARY_MAX_TOKENS, TEMPERATURE), content)
+        return content
+
+    def _report_triage(self, skipped_before: int, total: int):
+        """Print how many PRs triage answered without a model call."""
+        skipped = self.metrics.counters.get('llm_calls_skipped',
+                                            0) - skipped_before
+        if skipped:
+            print(
+                f"⚡ Triage: {skipped} of {total} PRs summarized from templates, skipping their LLM calls"
+            )
+
+    def _summarize_checkpointed(self, pr: Dict, checkpoint=None) -> str:
+        """
+        Summarize one PR, isolating failures as "Error: ..." summaries and
+        reusing or recording the summary in the checkpoint if given.
+        """
+        if checkpoint:
+            done = checkpoint.get(pr['pr_url'])
+            if done:
+                return done['ai_summary']
+        try:
+            summary = self.triage(pr)
+            if not summary:
+                self._count_condensed([pr])
+                summary = self.summarize_pr(pr['title'],
+                                            pr.get('description', ''))
+        except Exception as e:
+            summary = f"Error: {str(e)}"
+        if checkpoint:
+            self._checkpoint_summary(checkpoint, pr['pr_url'], summary)
+        return summary
+
+    @staticmethod
+    def _checkpoint_summary(checkpoint, pr_url: str, summary: str):
+        """Record a summary; failed ones are left out so a resume retries them."""
+        if not summary.startswith("Error:"):
+            checkpoint.append(pr_url, {'ai_summary': summary})
+
+    def summarize_stream(self,
+                         pr_queue: queue.Queue,
+                         concurrency: int = 8,
+                         checkpoint=None) -> List[Dict]:
+        """
+        Summarize PRs as they arrive on pr_queue until a None sentinel is
+        received. Returns the PR records, in arrival order, with
+        'ai_summary' and 'cluster_id' fields added. Near-duplicates of an
+        earlier PR reuse its summary instead of sending a request.
+        """
+        # Bound in-flight work so a fast producer can't queue up unlimited
+        # summary requests
+        slots = threading.BoundedSemaphore(max(1, concurrency) * 2)
+
+        def summarize(pr: Dict) -> str:
+            try:
+                return self._summarize_checkpointed(pr, checkpoint)
+            finally:
+                slots.release()
+
+        index = None
+        if self.dedup_threshold > 0:
+            from pr_dedup import NearDuplicateIndex
+            index = NearDuplicateIndex(self.dedup_threshold)
+
+        skipped_before = self.metrics.counters.get('llm_calls_skipped', 0)
+        prs = []
+        futures = []
+        cluster_futures = {}
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            while True:
+                pr = pr_queue.get()
+                if pr is None:
+                    break
+                # The producer still owns and exports its record; the
+                # summary fields go on a copy
+                pr = dict(pr)
+                if index:
+                    pr['cluster_id'], is_new = index.add(pr)
+                else:
+                    pr['cluster_id'], is_new = len(prs), True
+                prs.append(pr)
+                if is_new:
+                    slots.acquire()
+                    cluster_futures[pr['cluster_id']] = pool.submit(
+                        summarize, pr)
+                futures.append(cluster_futures[pr['cluster_id']])
+
+            for idx, (pr, future) in enumerate(zip(prs, futures)):
+                pr['ai_summary'] = future.result()
+                print(
+                    f"Processed PR {idx + 1}/{len(prs)}: {str(pr['title'])[:50]}..."
+                )
+        self._report_triage(skipped_before, len(prs))
+        self._report_dedup(len(prs), len(cluster_futures))
+        return prs
 
     def extract_project_from_title(self, title: str) -> str:
         """Extract project key from PR title format: [xxx-xxx] <project key>: xxx"""
-        import re
+        return project_key(title)
 
-        # Match pattern: [ticket] project: description
-        # Examples: [CS-6304] Roles: something, [CS-0000] Roles: something
-        pattern = r'\[([^\]]+)\]\s*([^:]+):'
-        match = re.match(pattern, title)
+    def _format_pr_line(self, pr: Dict) -> str:
+        """One bullet per PR for analysis prompts."""
+        return f"• [{self.extract_project_from_title(pr['title'])}] {pr.get('ai_summary', 'No summary')}"
 
-        if match:
-            ticket_id = match.group(1)
-            project_key = match.group(2).strip()
-            return project_key
+    def _chunk_by_project(self, projects: Dict[str, List[Dict]],
+                          chunk_size: int) -> List[List[Dict]]:
+        """
+        Split PRs into chunks of at most chunk_size, keeping each project's
+        PRs together and packing small projects into shared chunks.
+        """
+        chunks = []
+        current = []
+        for prs in sorted(projects.values(), key=len, reverse=True):
+            for start in range(0, len(prs), chunk_size):
+                piece = prs[start:start + chunk_size]
+                if current and len(current) + len(piece) > chunk_size:
+                    chunks.append(current)
+                    current = []
+                current.extend(piece)
+        if current:
+            chunks.append(current)
+        return chunks
 
-        # Fallback: try to extract just the project name after ]
-        fallback_pattern = r'\][^:]*?([A-Za-z][A-Za-z\s]+?):'
-        fallback_match = re.search(fallback_pattern, title)
-        if fallback_match:
-            return fallback_match.group(1).strip()
+    def _analyze_chunk(self, prs: List[Dict]) -> str:
+        """Map step: condense one chunk of PR summaries into analysis notes."""
+        summaries = "\n".join(self._format_pr_line(pr) for pr in prs)
+        prompt = f"""These are summaries of {len(prs)} GitHub pull requests, tagged by project:
 
-        return "Uncategorized"
+{summaries}
 
-    def analyze_pr_patterns(self, pr_data: List[Dict]) -> str:
-        """Analyze patterns across multiple PRs with project categorization."""
+Write concise analysis notes (at most 200 words) for a later combined report. Cover the projects involved and the work done in each, technical themes, the balance of features vs. fixes vs. maintenance, and the most significant changes. Keep concrete examples and numbers.
+
+Notes:"""
+        return self._call_openai(prompt, max_tokens=400)
+
+    def _merge_notes(self, notes: List[str]) -> str:
+        """Reduce step: merge several sets of analysis notes into one."""
+        combined = "\n\n---\n\n".join(notes)
+        prompt = f"""Merge these partial analyses of GitHub pull requests into one set of concise analysis notes (at most 300 words). Keep the most significant projects, themes, accomplishments, concrete examples and numbers.
+
+{combined}
+
+Merged notes:"""
+        return self._call_openai(prompt, max_tokens=500)
+
+    def analyze_pr_patterns(self,
+                            pr_data: List[Dict],
+                            concurrency: int = 8,
+                            chunk_size: int = 40,
+                            fanout: int = 5) -> str:
+        """
+        Analyze patterns across multiple PRs with project categorization.
+        Up to chunk_size PRs are analyzed in one request. Larger sets are
+        analyzed map-reduce style: chunks of PRs grouped by project are
+        condensed into notes concurrently, then notes are merged `fanout`
+        at a time until one set remains for the final report, so every PR
+        contributes to the analysis.
+        """
         # Extract project information and group PRs
         projects = {}
-        for pr in pr_data:
-            project = self.extract_project_from_title(pr['title'])
+        for pr, project in zip(pr_data,
+                               project_keys(pr['title'] for pr in pr_data)):
             if project not in projects:
                 projects[project] = []
             projects[project].append(pr)
 
         # Build project breakdown
         project_breakdown = []
+        has_lines = bool(pr_data) and 'lines_of_code_changes' in pr_data[0]
         for project, prs in projects.items():
-            total_lines = sum(pr.get('lines_of_code_changes', 0) for pr in prs)
-            project_breakdown.append(
-                f"• {project}: {len(prs)} PRs, {total_lines} lines changed")
-
-        # Combine summaries for AI analysis (limit to avoid token limits)
-        combined_summaries = "\n".join([
-            f"• [{self.extract_project_from_title(pr['title'])}] {pr.get('ai_summary', 'No summary')}"
-            for pr in pr_data[:20]
-        ])
+            breakdown = f"• {project}: {len(prs)} PRs"
+            if has_lines:
+                total_lines = sum(
+                    pr.get('lines_of_code_changes') or 0 for pr in prs)
+                breakdown += f", {total_lines} lines changed"
+            project_breakdown.append(breakdown)
 
         project_breakdown_text = "\n".join(project_breakdown)
 
+        if len(pr_data) <= chunk_size:
+            section_title = "PR SUMMARIES BY PROJECT"
+            section_body = "\n".join(
+                self._format_pr_line(pr) for pr in pr_data)
+        else:
+            chunks = self._chunk_by_project(projects, chunk_size)
+            print(
+                f"🧩 Analyzing {len(pr_data)} PRs in {len(chunks)} chunks...")
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                notes = list(pool.map(self._analyze_chunk, chunks))
+                round_number = 0
+                while len(notes) > fanout:
+                    round_number += 1
+                    groups = [
+                        notes[i:i + fanout]
+                        for i in range(0, len(notes), fanout)
+                    ]
+                    print(
+                        f"🧩 Merge round {round_number}: {len(notes)} partial analyses -> {len(groups)}"
+                    )
+                    notes = list(pool.map(self._merge_notes, groups))
+
+            failed = [note for note in notes if note.startswith("Error:")]
+            if failed:
+                print(f"⚠️  {len(failed)} partial analyses failed")
+            section_title = "PARTIAL ANALYSES"
+            section_body = "\n\n---\n\n".join(
+                note for note in notes if not note.startswith("Error:"))
+
         prompt = f"""Analyze these GitHub PR summaries and provide a comprehensive development activity report:
 
 PROJECT BREAKDOWN:
 {project_breakdown_text}
 
-PR SUMMARIES BY PROJECT:
-{combined_summaries}
+{section_title}:
+{section_body}
 
 Provide a detailed analysis covering:
 
@@ -160,53 +823,136 @@ Analysis:"""
         return self._call_openai(prompt, max_tokens=800)
 
 
-def process_pr_csv(csv_file: str, output_file: str = None) -> str:
-    """Process a CSV file of PRs and generate summaries."""
-    # Load PR data
+def missing_fields(prs: List[Dict], fields) -> List[str]:
+    """Those of fields that loaded PRs (rows of one export) don't carry."""
+    return [name for name in fields if prs and name not in prs[0]]
+
+
+def process_pr_csv(csv_file: str,
+                   output_file: str = None,
+                   concurrency: int = None,
+                   batch_tokens: int = None,
+                   resume: bool = False,
+                   batch_job: bool = None) -> str:
+    """
+    Process a CSV file of PRs and generate summaries. concurrency bounds the
+    number of simultaneous summary requests (default: SUMMARY_CONCURRENCY);
+    batch_tokens > 0 packs several PRs per request (default:
+    SUMMARY_BATCH_TOKENS, off). With batch_job (default: SUMMARY_BATCH_JOB),
+    summaries come from an offline Batch API job instead. Summaries are
+    checkpointed as they finish; with resume, PRs summarized by an
+    interrupted run are skipped.
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv('SUMMARY_CONCURRENCY', '8'))
+    if batch_tokens is None:
+        batch_tokens = int(os.getenv('SUMMARY_BATCH_TOKENS', '0'))
+    if batch_job is None:
+        batch_job = os.getenv('SUMMARY_BATCH_JOB', '').lower() in ('1', 'true',
+                                                                   'yes')
+
+    from pr_columnar import is_dataset, read_dataset
+    from pr_records import read_pr_csv
+
+    # Load PR data from a detailed CSV or its columnar copy
     try:
-        df = pd.read_csv(csv_file)
-        print(f"📊 Loaded {len(df)} PRs from {csv_file}")
+        if is_dataset(csv_file):
+            prs = read_dataset(csv_file)
+        else:
+            prs = list(read_pr_csv(csv_file))
+        print(f"📊 Loaded {len(prs)} PRs from {csv_file}")
     except Exception as e:
         print(f"❌ Error loading CSV: {e}")
         return None
+    # Checked before any model call is paid for
+    missing = missing_fields(prs, REQUIRED_FIELDS)
+    if missing:
+        print(
+            f"❌ {csv_file} has no {', '.join(missing)} column(s); fetch again including them in --fields"
+        )
+        return None
+    if prs and 'description' not in prs[0]:
+        print("⚠️  No description column; summarizing from titles only")
 
     # Initialize summarizer
     summarizer = PRSummarizer()
 
-    # Generate summaries
-    print("🤖 Generating AI summaries...")
-    summaries = []
+    from checkpoint import Checkpoint
+    checkpoint = Checkpoint(
+        f"output/checkpoints/summaries_{os.path.splitext(os.path.basename(csv_file))[0]}.jsonl",
+        resume)
+
+    # Generate summaries; pacing against API rate limits happens in the
+    # shared scheduler
+    # Near-duplicates (backports, cherry-picks) share one summary; only
+    # each cluster's first PR is sent to the model
+    representatives = {}
+    for pr, cluster_id in zip(prs, summarizer.cluster_prs(prs)):
+        pr['cluster_id'] = cluster_id
+        representatives.setdefault(cluster_id, pr)
 
-    for idx, row in df.iterrows():
-        print(f"Processing PR {idx + 1}/{len(df)}: {row['title'][:50]}...")
+    with summarizer.metrics.stage('summarize'):
+        if batch_job:
+            print("🤖 Generating AI summaries with an offline batch job...")
+            summaries = summarizer.summarize_batch_job(
+                list(representatives.values()), checkpoint,
+                os.path.splitext(os.path.basename(csv_file))[0])
+        else:
+            print(
+                f"🤖 Generating AI summaries ({concurrency} concurrent)...")
+            summaries = summarizer.summarize_prs(
+                list(representatives.values()), concurrency, batch_tokens,
+                checkpoint)
+    by_cluster = dict(zip(representatives, summaries))
+    for pr in prs:
+        pr['ai_summary'] = by_cluster[pr['cluster_id']]
+
+    output_file = save_summarized_results(prs, summarizer, csv_file,
+                                          output_file, concurrency)
+    checkpoint.close(remove=True)
+    return output_file
 
-        summary = summarizer.summarize_pr(row['title'], row['description'])
-        summaries.append(summary)
 
-        # Add a small delay to respect API rate limits
-        import time
-        time.sleep(0.1)
+def save_summarized_results(prs: List[Dict],
+                            summarizer: PRSummarizer,
+                            csv_file: str,
+                            output_file: str = None,
+                            concurrency: int = 8,
+                            columnar_format: str = None,
+                            write_data: bool = True) -> str:
+    """
+    Analyze patterns across summarized PRs and write the summarized CSV and
+    markdown report. Output names are derived from the detailed csv_file
+    (a CSV or columnar dataset) unless output_file is given. prs are PR
+    records or dicts. With columnar_format (default: COLUMNAR_FORMAT, or
+    the input's format), a columnar copy of the summarized data is written
+    too; write_data=False only rewrites the markdown report.
+    """
+    from pr_columnar import dataset_path, is_dataset, write_dataset
+    from pr_records import write_pr_csv
 
-    # Add summaries to dataframe
-    df['ai_summary'] = summaries
+    if columnar_format is None:
+        columnar_format = os.getenv('COLUMNAR_FORMAT', '').lower() or (
+            os.path.splitext(csv_file)[1].lstrip('.')
+            if is_dataset(csv_file) else '')
 
     # Generate pattern analysis
     print("🔍 Analyzing patterns...")
-    # Convert DataFrame to list of dictionaries for analysis
-    pr_data_list = df.to_dict('records')
-    pattern_analysis = summarizer.analyze_pr_patterns(pr_data_list)
+    with summarizer.metrics.stage('analyze'):
+        pattern_analysis = summarizer.analyze_pr_patterns(prs, concurrency)
+    write_started = time.perf_counter()
 
     # Ensure output directory exists
-    import os
     os.makedirs('output', exist_ok=True)
 
     # Save results with new naming format
     if not output_file:
         # Extract date range from filename (pr_YYYY-MM-DD_YYYY-MM-DD.csv)
-        base_name = os.path.basename(csv_file)
-        if base_name.startswith('pr_') and base_name.endswith('.csv'):
+        base_name, extension = os.path.splitext(os.path.basename(csv_file))
+        if base_name.startswith('pr_') and (extension == '.csv'
+                                            or is_dataset(csv_file)):
             # Extract date range from filename, removing any suffix like '_detailed'
-            date_part = base_name[3:-4]  # Remove 'pr_' and '.csv'
+            date_part = base_name[3:]  # Remove 'pr_'
             # Remove '_detailed' suffix if present
             if date_part.endswith('_detailed'):
                 date_part = date_part[:-9]  # Remove '_detailed'
@@ -216,11 +962,24 @@ def process_pr_csv(csv_file: str, output_file: str = None) -> str:
             base_name = os.path.splitext(csv_file)[0]
             output_file = f"{base_name}_summarized.csv"
 
-    df.to_csv(output_file, index=False)
-    print(f"💾 Saved summarized data to {output_file}")
+    if write_data:
+        write_pr_csv(output_file, prs)
+        print(f"💾 Saved summarized data to {output_file}")
+        if columnar_format:
+            try:
+                path = write_dataset(prs,
+                                     dataset_path(output_file,
+                                                  columnar_format),
+                                     columnar_format)
+                print(f"💾 Saved summarized data to {path}")
+            except ImportError as e:
+                print(f"❌ {e}")
 
     # Save pattern analysis with new naming format as markdown
     analysis_file = output_file.replace('_summarized.csv', '_summary.md')
+    cluster_sizes = Counter(pr.get('cluster_id') for pr in prs)
+    has_lines = bool(prs) and 'lines_of_code_changes' in prs[0]
+    total_lines = sum(pr.get('lines_of_code_changes') or 0 for pr in prs)
     with open(analysis_file, 'w') as f:
         # Extract date range for title
         base_name = os.path.basename(output_file)
@@ -233,13 +992,13 @@ def process_pr_csv(csv_file: str, output_file: str = None) -> str:
 
         f.write(f"# GitHub PR Analysis Report\n\n")
         f.write(f"**Period:** {date_range}  \n")
-        f.write(f"**Total PRs:** {len(df)}  \n")
-        f.write(
-            f"**Total Lines Changed:** {df['lines_of_code_changes'].sum():,}  \n"
-        )
-        f.write(
-            f"**Average Lines per PR:** {df['lines_of_code_changes'].mean():.1f}  \n\n"
-        )
+        f.write(f"**Total PRs:** {len(prs)}  \n")
+        if has_lines:
+            f.write(f"**Total Lines Changed:** {total_lines:,}  \n")
+            f.write(
+                f"**Average Lines per PR:** {total_lines / max(1, len(prs)):.1f}  \n"
+            )
+        f.write("\n")
 
         f.write("---\n\n")
         f.write("## 📊 Development Activity Analysis\n\n")
@@ -247,28 +1006,52 @@ def process_pr_csv(csv_file: str, output_file: str = None) -> str:
         f.write("\n\n---\n\n")
         f.write("## 📋 Individual PR Summaries\n\n")
 
-        for idx, (_, row) in enumerate(df.iterrows()):
+        for idx, row in enumerate(prs):
             # Extract project from title for better organization
-            project = "Uncategorized"
-            import re
-            pattern = r'\[([^\]]+)\]\s*([^:]+):'
-            match = re.match(pattern, row['title'])
-            if match:
-                project = match.group(2).strip()
+            project = project_key(row['title'])
 
             f.write(f"### {idx + 1}. {row['title']}\n\n")
             f.write(f"**Project:** `{project}`  \n")
-            f.write(
-                f"**Lines Changed:** {row['lines_of_code_changes']} (+{row['additions']}, -{row['deletions']})  \n"
-            )
-            f.write(
-                f"**Status:** {row['state'].title()} {'✅' if row['merged'] == True else '🔄' if row['state'] == 'open' else '❌'}  \n"
-            )
+            # Present in multi-repo / multi-author (fan-out) exports
+            if 'repo' in row:
+                f.write(f"**Repository:** {row['repo']}  \n")
+            if 'author' in row:
+                f.write(f"**Author:** {row['author']}  \n")
+            if 'cluster_id' in row and cluster_sizes[row['cluster_id']] > 1:
+                f.write(
+                    f"**Near-Duplicates:** cluster {row['cluster_id']} ({cluster_sizes[row['cluster_id']]} PRs share this summary)  \n"
+                )
+            # Columns left out of the export (fetch --fields) are skipped
+            if row.get('lines_of_code_changes') is not None:
+                changes = ''
+                if 'additions' in row and 'deletions' in row:
+                    changes = f" (+{row['additions']}, -{row['deletions']})"
+                f.write(
+                    f"**Lines Changed:** {row['lines_of_code_changes']}{changes}  \n"
+                )
+            if row.get('state'):
+                f.write(
+                    f"**Status:** {row['state'].title()} {'✅' if row.get('merged') == True else '🔄' if row['state'] == 'open' else '❌'}  \n"
+                )
             f.write(f"**URL:** {row['pr_url']}\n\n")
-            f.write(f"**Summary:** {row['ai_summary']}\n\n")
+            f.write(f"**Summary:** {row.get('ai_summary', 'No summary')}\n\n")
             f.write("---\n\n")
 
     print(f"📝 Saved pattern analysis to {analysis_file}")
+    summarizer.metrics.record_stage('write',
+                                    time.perf_counter() - write_started)
+
+    if summarizer.cache:
+        print(f"🗄️  LLM cache: {summarizer.cache.stats()}")
+
+    # Machine-readable timings, latencies, retries and token usage, in a
+    # file per stage so a report run doesn't replace the summarize run's;
+    # in the full workflow this also covers the fetch stages
+    summarizer.metrics.increment('prs_summarized', len(prs))
+    stage = 'summarize' if write_data else 'report'
+    summarizer.metrics.write(
+        os.path.splitext(output_file)[0].replace('_summarized', '') +
+        f'_{stage}_metrics.json')
 
     # Print quick summary
     print("\n🎯 QUICK ANALYSIS")
@@ -278,43 +1061,77 @@ def process_pr_csv(csv_file: str, output_file: str = None) -> str:
     return output_file
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Summarize GitHub PRs using OpenAI')
-    parser.add_argument('csv_file', nargs='?', help='CSV file to process')
+def find_latest_csv(summarized: bool = False) -> str:
+    """
+    Return the most recently written PR CSV in output/: detailed exports by
+    default, or summarized ones. Exits with a hint if there is none.
+    """
+    output_dir = 'output'
+    if not os.path.exists(output_dir):
+        print("❌ No output directory found.")
+        print("Run the PR fetcher first to generate CSV data.")
+        sys.exit(1)
+
+    csv_files = [
+        f"{output_dir}/{f}" for f in os.listdir(output_dir)
+        if f.startswith('pr_') and f.endswith('.csv')
+        and ('summarized' in f) == summarized
+    ]
+    if not csv_files:
+        print("❌ No PR CSV files found in output directory.")
+        print("Run the PR fetcher first to generate CSV data.")
+        sys.exit(1)
+
+    # Use the most recent file
+    csv_files.sort(key=os.path.getmtime, reverse=True)
+    print(f"🔍 Auto-detected CSV file: {csv_files[0]}")
+    return csv_files[0]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the summarizer's command-line options to parser."""
+    parser.add_argument('csv_file',
+                        nargs='?',
+                        help='CSV file or columnar dataset to process')
     parser.add_argument('--output', help='Output file name')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Maximum simultaneous summary requests (default: 8)')
+    parser.add_argument(
+        '--batch-tokens',
+        type=int,
+        help='Pack several PRs into each request, up to about this many tokens')
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Resume an interrupted run from its checkpoint')
+    parser.add_argument(
+        '--batch-job',
+        action='store_true',
+        default=None,
+        help='Summarize through an offline Batch API job (same as '
+        'SUMMARY_BATCH_JOB=1)')
+
 
-    args = parser.parse_args()
+def main(args: argparse.Namespace = None):
+    if args is None:
+        parser = argparse.ArgumentParser(
+            description='Summarize GitHub PRs using OpenAI')
+        add_arguments(parser)
+        args = parser.parse_args()
 
     # Auto-detect CSV file if not provided
     if not args.csv_file:
-        import os
-        output_dir = 'output'
-        if not os.path.exists(output_dir):
-            print("❌ No output directory found.")
-            print("Run the PR fetcher first to generate CSV data.")
-            sys.exit(1)
-
-        csv_files = [
-            f"{output_dir}/{f}" for f in os.listdir(output_dir)
-            if f.startswith('pr_') and f.endswith('.csv')
-            and 'summarized' not in f
-        ]
-        if not csv_files:
-            print("❌ No PR CSV files found in output directory.")
-            print("Run the PR fetcher first to generate CSV data.")
-            sys.exit(1)
-
-        # Use the most recent file
-        csv_files.sort(key=os.path.getmtime, reverse=True)
-        args.csv_file = csv_files[0]
-        print(f"🔍 Auto-detected CSV file: {args.csv_file}")
+        args.csv_file = find_latest_csv()
 
     # Process the file
-    result_file = process_pr_csv(args.csv_file, args.output)
+    result_file = process_pr_csv(args.csv_file, args.output, args.concurrency,
+                                 args.batch_tokens, args.resume,
+                                 args.batch_job)
 
     if result_file:
         print(f"\n✅ Summary complete! Check {result_file}")
+    return result_file
 
 
 if __name__ == "__main__":
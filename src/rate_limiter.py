@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Scheduler
+Shared, rate-limit-aware scheduler for GitHub and OpenAI requests. Each
+endpoint class (GitHub search, core REST, GraphQL, OpenAI chat completions)
+gets its own token bucket and adaptive concurrency limit. Rate-limit
+response headers adjust the pace on the fly, and rate-limit errors are
+retried with jittered backoff instead of failing.
+"""
+
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from metrics import Metrics, get_metrics
+
+# Default pace (requests per minute) and concurrency cap per endpoint class,
+# matching GitHub's per-minute search and secondary REST/GraphQL limits
+DEFAULT_LIMITS = {
+    'search': (30, 2),
+    'core': (900, 16),
+    'graphql': (300, 4),
+    'chat': (500, 32),
+}
+
+# Below this fraction of the budget left, requests are spread evenly over
+# the time remaining until the budget resets
+LOW_BUDGET_FRACTION = 0.2
+
+# How many consecutive successes grow an endpoint's concurrency by one
+SUCCESSES_PER_STEP = 10
+
+
+class TokenBucket:
+
+    def __init__(self, per_minute: float, burst: float = None):
+        """
+        Bucket refilling at per_minute tokens/minute, holding up to burst
+        tokens (by default ten seconds' worth).
+        """
+        self.rate = per_minute / 60
+        self.max_rate = self.rate
+        self.capacity = burst if burst else max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens +
+                                  (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now,
+                           (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` seconds."""
+        with self._lock:
+            self.paused_until = max(self.paused_until,
+                                    time.monotonic() + seconds)
+
+    def set_rate(self, per_second: float):
+        """Change the refill rate, never exceeding the configured maximum."""
+        with self._lock:
+            self.rate = max(0.01, min(self.max_rate, per_second))
+
+
+class EndpointLimiter:
+
+    def __init__(self, per_minute: float, max_concurrency: int):
+        """Token bucket plus an AIMD-adjusted in-flight request limit."""
+        self.bucket = TokenBucket(per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.retries = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while self.in_flight >= self.concurrency:
+                self._cond.wait()
+            self.in_flight += 1
+        self.bucket.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def record_success(self):
+        """Additively grow concurrency after a run of successes."""
+        with self._cond:
+            self.successes += 1
+            if (self.successes >= SUCCESSES_PER_STEP
+                    and self.concurrency < self.max_concurrency):
+                self.concurrency += 1
+                self.successes = 0
+                self._cond.notify_all()
+
+    def record_throttled(self):
+        """Multiplicatively shrink concurrency after a rate-limit error."""
+        with self._cond:
+            self.retries += 1
+            self.successes = 0
+            self.concurrency = max(1, self.concurrency // 2)
+
+
+def _parse_reset_duration(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations such as '1s', '6m0s' or '20ms'."""
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        matched = True
+        total += float(amount) * {
+            'ms': 0.001,
+            's': 1,
+            'm': 60,
+            'h': 3600
+        }[unit]
+    return total if matched else None
+
+
+def _header(headers, name: str) -> Optional[str]:
+    """Case-insensitive header lookup that tolerates plain dicts."""
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class RateLimitScheduler:
+
+    def __init__(self,
+                 limits: Dict[str, tuple] = None,
+                 max_retries: int = 6,
+                 metrics: Metrics = None):
+        """
+        Create per-endpoint limiters. limits maps endpoint class to
+        (requests per minute, max concurrency). Latencies and retries are
+        recorded in metrics (the process-wide registry by default).
+        """
+        self.max_retries = max_retries
+        self.metrics = metrics or get_metrics()
+        self.limiters = {
+            endpoint: EndpointLimiter(per_minute, concurrency)
+            for endpoint, (per_minute,
+                           concurrency) in (limits or DEFAULT_LIMITS).items()
+        }
+
+    @staticmethod
+    def endpoint_for_url(url: str) -> str:
+        """Classify a GitHub API URL into its rate-limit endpoint class."""
+        path = urlparse(url).path
+        if path.endswith('/graphql'):
+            return 'graphql'
+        if '/search/' in path:
+            return 'search'
+        return 'core'
+
+    def observe(self, endpoint: str, headers):
+        """
+        Adjust an endpoint's pace from rate-limit response headers. Once
+        the remaining budget runs low it is spread over the time left until
+        it resets; when exhausted, the endpoint pauses until the reset.
+        """
+        limiter = self.limiters.get(endpoint)
+        if not limiter:
+            return
+
+        try:
+            # GitHub: remaining count and reset as a UNIX timestamp
+            remaining = _header(headers, 'x-ratelimit-remaining')
+            limit = _header(headers, 'x-ratelimit-limit')
+            reset = _header(headers, 'x-ratelimit-reset')
+            if remaining is not None and reset is not None:
+                seconds_left = max(1.0, float(reset) - time.time())
+            else:
+                # OpenAI: remaining requests and reset as a duration
+                remaining = _header(headers, 'x-ratelimit-remaining-requests')
+                limit = _header(headers, 'x-ratelimit-limit-requests')
+                reset = _header(headers, 'x-ratelimit-reset-requests')
+                if remaining is None or reset is None:
+                    return
+                seconds_left = max(1.0, _parse_reset_duration(reset) or 1.0)
+            remaining = int(remaining)
+            limit = int(limit) if limit is not None else None
+        except (TypeError, ValueError):
+            return
+
+        if remaining <= 0:
+            limiter.bucket.pause(seconds_left)
+        elif limit and remaining > limit * LOW_BUDGET_FRACTION:
+            limiter.bucket.set_rate(limiter.bucket.max_rate)
+        else:
+            limiter.bucket.set_rate(remaining / seconds_left)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Return how long to wait before retrying after `error`, or None if
+        the error isn't a rate-limit, transient server or connection error.
+        """
+        response = getattr(error, 'response', None)
+        status = (getattr(error, 'status', None)
+                  or getattr(error, 'status_code', None)
+                  or getattr(response, 'status_code', None))
+        headers = getattr(error, 'headers', None) or getattr(
+            response, 'headers', None)
+
+        throttled = status == 429 or (status == 403 and (
+            'rate limit' in str(error).lower()
+            or _header(headers, 'retry-after') is not None
+            or _header(headers, 'x-ratelimit-remaining') == '0'))
+        transient = ((isinstance(status, int) and status >= 500)
+                     or _is_connection_error(error))
+        if not (throttled or transient):
+            return None
+
+        retry_after = _header(headers, 'retry-after')
+        reset = _header(headers, 'x-ratelimit-reset')
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = 60.0
+        elif _header(headers, 'x-ratelimit-remaining') == '0' and reset:
+            delay = max(0.0, float(reset) - time.time())
+        else:
+            delay = min(60.0, 2**attempt)
+
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return delay + random.uniform(0, min(60.0, 2**attempt))
+
+    def slot(self, endpoint: str) -> EndpointLimiter:
+        """
+        Context manager that waits for the endpoint's pace and concurrency
+        limit before a single request is sent.
+        """
+        return self.limiters[endpoint]
+
+    def retry(self, endpoint: str, func: Callable, *args, **kwargs):
+        """
+        Run func, retrying rate-limit, transient server and connection
+        errors with jittered backoff. Pacing is left to func (see slot()).
+        """
+        limiter = self.limiters[endpoint]
+        attempt = 0
+        while True:
+            try:
+                result = func(*args, **kwargs)
+                limiter.record_success()
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                limiter.record_throttled()
+                self.metrics.record_retry(endpoint)
+                limiter.bucket.pause(delay)
+                attempt += 1
+                print(
+                    f"⏳ {endpoint} request failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries})"
+                )
+
+    def call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """
+        Run func under the endpoint's pace and concurrency limit, retrying
+        rate-limit, transient server and connection errors with jittered
+        backoff.
+        """
+
+        def paced():
+            with self.slot(endpoint):
+                return func(*args, **kwargs)
+
+        return self.retry(endpoint, paced)
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """
+    Whether error is a dropped connection or timeout from the OpenAI client
+    or requests. The libraries are looked up rather than imported, since
+    an error can only come from one already loaded.
+    """
+    connection_errors = []
+    openai = sys.modules.get('openai')
+    if openai:
+        # APITimeoutError is a subclass
+        connection_errors.append(openai.APIConnectionError)
+    requests = sys.modules.get('requests')
+    if requests:
+        connection_errors += [requests.ConnectionError, requests.Timeout]
+    return isinstance(error, tuple(connection_errors))
+
+
+def _define_scheduled_adapter():
+    """
+    Define ScheduledHTTPAdapter. requests is imported here rather than at
+    module level, so the summarizer, which only needs the scheduler, never
+    loads it.
+    """
+    import requests
+
+    class ScheduledHTTPAdapter(requests.adapters.HTTPAdapter):
+        """
+        HTTPAdapter that paces every request through a RateLimitScheduler and
+        feeds the response's rate-limit headers back into it. Request latency
+        is recorded in the scheduler's metrics.
+        """
+
+        def __init__(self, *, scheduler: RateLimitScheduler, **kwargs):
+            super().__init__(**kwargs)
+            self.scheduler = scheduler
+
+        def send(self, request: requests.PreparedRequest, **kwargs):
+            endpoint = self.scheduler.endpoint_for_url(request.url)
+            with self.scheduler.slot(endpoint):
+                started = time.perf_counter()
+                try:
+                    response = super().send(request, **kwargs)
+                except Exception:
+                    self.scheduler.metrics.record_request(
+                        endpoint, time.perf_counter() - started, error=True)
+                    raise
+            self.scheduler.metrics.record_request(
+                endpoint, time.perf_counter() - started,
+                error=response.status_code >= 400)
+            self.scheduler.observe(endpoint, response.headers)
+            return response
+
+    return ScheduledHTTPAdapter
+
+
+def __getattr__(name: str):
+    # Module-level lazy attribute (PEP 562): the adapter class is built the
+    # first time it is imported and then cached as a regular global
+    if name == 'ScheduledHTTPAdapter':
+        with _scheduler_lock:
+            if name not in globals():
+                globals()[name] = _define_scheduled_adapter()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """
+    Return the process-wide scheduler, created on first use. Paces can be
+    overridden with GITHUB_SEARCH_RPM, GITHUB_CORE_RPM, GITHUB_GRAPHQL_RPM
+    and OPENAI_RPM.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            limits = dict(DEFAULT_LIMITS)
+            for endpoint, env_var in (('search', 'GITHUB_SEARCH_RPM'),
+                                      ('core', 'GITHUB_CORE_RPM'),
+                                      ('graphql', 'GITHUB_GRAPHQL_RPM'),
+                                      ('chat', 'OPENAI_RPM')):
+                if os.getenv(env_var):
+                    limits[endpoint] = (float(os.getenv(env_var)),
+                                        limits[endpoint][1])
+            _scheduler = RateLimitScheduler(limits)
+        return _scheduler